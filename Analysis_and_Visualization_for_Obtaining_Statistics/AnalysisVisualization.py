@@ -9,6 +9,7 @@ https://open.alberta.ca/opendata/wildfire-data-1996-2005
 """
 
 from Data_Extracting_and_Cleaning.Utils import Directory_utils as Dir
+from Data_Extracting_and_Cleaning.Utils import Result_cache_utils as Results
 import pandas as pd
 import matplotlib.pyplot  as plt
 import numpy as np
@@ -27,6 +28,11 @@ DeprecationWarning:
     provide us feedback at https://github.com/pandas-dev/pandas/issues/54466
 """
 # import Pyarrow
+
+# Cell sizes (in degrees) of the heatmap grids. Alberta spans about 11 x 10 degrees,
+# so even the finest grid holds at most ~11,000 cells, however many fires there are
+HEATMAP_CELL_SIZES = (0.5, 0.2, 0.1)
+
 """Start of the Funtion Definitions:"""
 
 def plot_graph_of_series(series, graph_type = "pie", title = "",axes = ["",""] ):
@@ -71,9 +77,33 @@ def plot_graph_of_series(series, graph_type = "pie", title = "",axes = ["",""] )
 
 
 
+@Results.Cached_result
+def get_value_counts(dataframe, column_name, sort = True):
+    """
+    Counts the fires of every value of a column, like dataframe[column_name].value_counts().
+    The counts are cached (see Result_cache_utils), so plotting them again on the same
+    data is free
+
+    Parameters:
+    ------------
+        dataframe - pd.Dataframe
+            a dataframe of the dataset
+        column_name - str
+            The column whose values are counted
+        sort - bool
+            Whether to sort by count, or keep the order the values first appear in
+    Returns:
+    ----------
+        a pd.Series of the counts, to use with plot_graph_of_series()
+    """
+    assert isinstance(dataframe, pd.DataFrame), "dataframe input must be a pandas Dataframe datatype"
+    assert isinstance(column_name, str) and column_name in dataframe.columns, "column_name input must be a column of the dataframe"
+    return dataframe[column_name].value_counts(sort=sort)
+
+@Results.Cached_result
 def get_operation_of_series_based_on_another_series(dataframe, column_names, op="mean", threshold= None):
     """
-    Finds the operation of average_series corresponding to the indices in value_count. Current Operations are mean, sum, and norm(normalize)
+    Finds the operation of average_series corresponding to the indices in value_count. Current Operations are mean, sum, norm(normalize), count and median (see get_grouped_operations())
 
     Parameters:
     ------------
@@ -91,66 +121,298 @@ def get_operation_of_series_based_on_another_series(dataframe, column_names, op=
     """
     assert isinstance(dataframe, pd.DataFrame), "dataframe input must be a pandas Dataframe datatype"
     assert isinstance(column_names, list) and len(column_names) == 2 and all([isinstance(i,str) for i in column_names]), "axes input must be a list of string"
-    counts = dataframe[column_names[0]].value_counts(sort=False)
-    output = []
-    out_indices = []
-    sum_of_counts = counts.values.sum()
-    other = 0
-    for type in counts.index:
-        temp_query = dataframe.query(f'{column_names[0]} == @type')
-        match op:
-            case "mean":#computes mean
-                operation_result = temp_query.loc[:,column_names[1]].mean(axis=0)
-            case "sum":
-                operation_result = temp_query.loc[:,column_names[1]].sum(axis=0)
+    result = get_grouped_operations(dataframe, column_names[0], [column_names[1]], [op], threshold=threshold)
+    return pd.Series(data = result['result'].to_numpy(), index = result[column_names[0]].to_numpy())
+
+@Results.Cached_result
+def get_grouped_operations(dataframe, group_column, value_columns, ops = ("mean",), quantiles = None, threshold = None):
+    """
+    Computes operations of several value columns for every category of a column, from a
+    single hash groupby of the dataframe instead of one scan of it per category
+
+    Parameters:
+    ------------
+        dataframe - pd.Dataframe
+            a dataframe of the dataset
+        group_column - str
+            The column containing the categories
+        value_columns - list of str
+            The columns the operations are computed on
+        ops - list of str
+            Operations per category: mean, sum, median of every value column, and count
+            (number of fires) and norm (percentage of the fires) of the category itself
+        quantiles - list of float
+            Quantiles (between 0 and 1) of every value column, named like "q0.9"
+        threshold - Float
+            The lowest value before we cut it out of the output
+    Returns:
+    ----------
+        a tidy pd.Dataframe with one row per category, value column and operation: the
+        category, 'column' (None for count and norm), 'operation' and 'result'. The
+        categories are in the order they first appear in, like value_counts(sort=False)
+    """
+    value_operations = ["mean", "sum", "median"]
+    assert isinstance(dataframe, pd.DataFrame), "dataframe input must be a pandas Dataframe datatype"
+    assert isinstance(group_column, str) and group_column in dataframe.columns, "group_column input must be a column of the dataframe"
+    assert isinstance(value_columns, list) and all([i in dataframe.columns for i in value_columns]), "value_columns input must be a list of columns of the dataframe"
+    assert isinstance(ops, (list, tuple)) and all([i in value_operations + ["count", "norm"] for i in ops]), "ops input must be a list of mean, sum, median, count and norm"
+    assert quantiles is None or (isinstance(quantiles, (list, tuple)) and all([0 <= q <= 1 for q in quantiles])), "quantiles input must be a list of numbers between 0 and 1"
+
+    # the categories are hashed once, every operation reuses the same groups
+    groups = dataframe.groupby(group_column, sort=False, observed=True)
+    sizes = groups.size()
+    aggregations = [operation for operation in ops if operation in value_operations]
+    aggregated = groups[value_columns].agg(aggregations) if value_columns and aggregations else None
+    results = []
+    for operation in ops:
+        match operation:
+            case "count":
+                results.append((None, operation, sizes))
             case "norm":
-                operation_result = counts[type]/sum_of_counts * 100
+                results.append((None, operation, sizes / sizes.sum() * 100))
+            case _:
+                for column in value_columns:
+                    results.append((column, operation, aggregated[(column, operation)]))
+    for q in quantiles or []:
+        quantile = groups[value_columns].quantile(q)
+        for column in value_columns:
+            results.append((column, f"q{q:g}", quantile[column]))
+
+    frames = []
+    for column, operation, values in results:
+        values = values.reindex(sizes.index)
         if None != threshold:#implements threshold to remove values below it
-            if operation_result > threshold:
-                output.append(operation_result)
-                out_indices.append(type)
-        else:
-            output.append(operation_result)
-            out_indices.append(type)
+            values = values[values > threshold]
+        frames.append(pd.DataFrame({group_column: values.index, 'column': column,
+                                    'operation': operation, 'result': values.to_numpy()}))
+    if not frames:
+        return pd.DataFrame(columns=[group_column, 'column', 'operation', 'result'])
+    return pd.concat(frames, ignore_index=True)
+
 
-    return pd.Series(data = output, index = out_indices)
 
+def filter_fires(dataframe, years = None, causes = None):
+    """
+    Keeps only the fires of some calendar years and/or general causes
 
+    Parameters:
+    ------------
+        dataframe - pd.Dataframe
+            a dataframe of the dataset
+        years - list of int
+            The calendar_year values to keep. All years are kept when None
+        causes - list of str
+            The general_cause_desc values to keep. All causes are kept when None
+    Returns:
+    ----------
+        a pd.Dataframe of the fires kept
+    """
+    assert isinstance(dataframe, pd.DataFrame), "dataframe input must be a pandas Dataframe datatype"
+    assert years is None or isinstance(years, (list, tuple)), "years input must be a list"
+    assert causes is None or isinstance(causes, (list, tuple)), "causes input must be a list"
+    keep = np.ones(len(dataframe), dtype=bool)
+    if years is not None:
+        keep &= dataframe['calendar_year'].isin(years).to_numpy()
+    if causes is not None:
+        keep &= dataframe['general_cause_desc'].isin(causes).to_numpy()
+    return dataframe[keep]
+
+def get_heatmap_grid(dataframe, column_names, cell_size, weight_column = None):
+    """
+    Bins the locations of the fires into square cells of a latitude/longitude grid
 
-def plot_latlong_heatmap(dataframe, column_names):
+    Parameters:
+    ------------
+        dataframe - pd.Dataframe
+            a dataframe of the dataset
+        column_names - list of str
+            The latitude and longitude columns, in degrees
+        cell_size - float
+            The width and height of a cell, in degrees. The cell edges are multiples of it,
+            so the grids of different cell sizes line up
+        weight_column - str
+            The column each fire is weighted by (e.g. current_size). Every fire counts
+            once when None
+    Returns:
+    ----------
+        a pd.Dataframe with the latitude and longitude of the center and the total weight
+        of every non empty cell
+    """
+    assert isinstance(dataframe, pd.DataFrame), "dataframe input must be a pandas Dataframe datatype"
+    assert isinstance(column_names, list) and len(column_names) == 2, "column_names input must be the latitude and longitude columns"
+    assert isinstance(cell_size, (int, float)) and cell_size > 0, "cell_size input must be a number > 0"
+    assert weight_column is None or weight_column in dataframe.columns, "weight_column must be a column of the dataframe"
+
+    latitudes = dataframe[column_names[0]].to_numpy(dtype=float)
+    longitudes = dataframe[column_names[1]].to_numpy(dtype=float)
+    weights = None if weight_column is None else dataframe[weight_column].to_numpy(dtype=float)
+    valid = ~(np.isnan(latitudes) | np.isnan(longitudes))
+    if weights is not None:
+        valid &= ~np.isnan(weights)
+        weights = weights[valid]
+    latitudes, longitudes = latitudes[valid], longitudes[valid]
+    if len(latitudes) == 0:
+        return pd.DataFrame({'latitude': [], 'longitude': [], 'weight': []})
+
+    latitude_edges = np.arange(np.floor(latitudes.min() / cell_size), np.floor(latitudes.max() / cell_size) + 2) * cell_size
+    longitude_edges = np.arange(np.floor(longitudes.min() / cell_size), np.floor(longitudes.max() / cell_size) + 2) * cell_size
+    grid, _, _ = np.histogram2d(latitudes, longitudes, bins=[latitude_edges, longitude_edges], weights=weights)
+
+    rows, columns = np.nonzero(grid)
+    return pd.DataFrame({'latitude': latitude_edges[rows] + cell_size / 2,
+                         'longitude': longitude_edges[columns] + cell_size / 2,
+                         'weight': grid[rows, columns]})
+
+def get_heatmap_pyramid(dataframe, column_names, cell_sizes = HEATMAP_CELL_SIZES, weight_column = None):
+    """
+    Bins the locations of the fires at several resolutions, from coarse to fine
+    (see get_heatmap_grid()), so a map only has to hold one weighted point per cell
+
+    Returns:
+    ----------
+        a dict of the grid of every cell size
+    """
+    assert isinstance(cell_sizes, (list, tuple)) and len(cell_sizes) > 0, "cell_sizes input must be a non empty list"
+    return {cell_size: get_heatmap_grid(dataframe, column_names, cell_size, weight_column) for cell_size in cell_sizes}
+
+def plot_latlong_heatmap(dataframe, column_names, cell_sizes = HEATMAP_CELL_SIZES, weight_column = None,
+                         years = None, causes = None):
     '''A customized function used to plot
     the latitude and longitude as a heat map
-    on a set of coordinate axes'''
+    on a set of coordinate axes. The fires are
+    binned into grids (see get_heatmap_pyramid())
+    and every resolution is a layer of the map,
+    so the map holds one point per cell instead
+    of one per fire. A resolution holding more
+    than half as many cells as there are fires
+    saves little and is left out (the coarsest
+    one is always kept). The fires can be limited
+    to some calendar years and/or general causes.'''
     assert isinstance(dataframe, pd.DataFrame), "dataframe input must be a pandas Dataframe datatype"
     assert isinstance(column_names, list)
 
+    fires = filter_fires(dataframe, years, causes)
+    pyramid = get_heatmap_pyramid(fires, column_names, cell_sizes, weight_column)
+    coarsest = max(pyramid)
+    pyramid = {cell_size: grid for cell_size, grid in pyramid.items()
+               if cell_size == coarsest or len(grid) <= len(fires) / 2}
 
-    # sns.kdeplot(data=dataframe[[column_names[0],column_names[1]]], x=column_names[0], y=column_names[1], fill=True,)
-    lat = dataframe[column_names[0]].tolist()
-    long = dataframe[column_names[1]].tolist()
+    m = folium.Map([54, -115], zoom_start=8)
 
-    data = []
+    # the finest resolution is shown first, the others can be picked from the layer control
+    finest = min(pyramid)
+    for cell_size, grid in pyramid.items():
+        max_weight = grid['weight'].max() if len(grid) else 1
+        data = np.column_stack([grid['latitude'], grid['longitude'], grid['weight'] / max_weight]).tolist()
+        HeatMap(data, name=f"{cell_size} degree cells", show=cell_size == finest).add_to(m)
+    if len(pyramid) > 1:
+        folium.LayerControl().add_to(m)
 
-    for i in range(0,len(lat)):
-        data.append([lat[i],long[i]])
-    #ax = sns.kdeplot([[lat],[long]], cmap="Blues", shade=True, shade_lowest=False)
+    display(m)
 
+def get_kde_bandwidth(values, weights, bandwidth = "scott"):
+    """
+    Returns the bandwidth of a gaussian kernel along one axis: the (weighted) standard
+    deviation of the values times Scott's or Silverman's factor, or that standard
+    deviation times a given number
+    """
+    total_weight = weights.sum()
+    mean = np.sum(weights * values) / total_weight
+    std = np.sqrt(np.sum(weights * (values - mean) ** 2) / total_weight)
+    effective_size = total_weight ** 2 / np.sum(weights ** 2)
+    match bandwidth:
+        case "scott":
+            factor = effective_size ** (-1 / 6)
+        case "silverman":
+            # (n * (d + 2) / 4) ** (-1 / (d + 4)) for d = 2 dimensions
+            factor = (effective_size * (2 + 2) / 4) ** (-1 / (2 + 4))
+        case _:
+            factor = float(bandwidth)
+    # a single location (or all fires at the same place) still gets a narrow kernel
+    return max(std * factor, 1e-6)
 
-    m = folium.Map([54, -115], zoom_start=8)
-    
-    HeatMap(data).add_to(m)
+def get_kde_grid(dataframe, column_names, grid_size = 200, bandwidth = "scott", weight_column = None, cut = 3):
+    """
+    Estimates the density of the fire locations with a gaussian kernel. Instead of summing
+    a kernel per fire over every grid point, the fires are binned onto the grid and the
+    bins are convolved with the kernel by FFT, so the time hardly grows with the number
+    of fires
 
-    display(m)
+    Parameters:
+    ------------
+        dataframe - pd.Dataframe
+            a dataframe of the dataset
+        column_names - list of str
+            The latitude and longitude columns, in degrees
+        grid_size - int
+            Number of grid points along each axis
+        bandwidth - str or float or tuple
+            "scott" or "silverman" for those rules, or a factor of the standard deviation
+            of the locations (like the bw_method of sns.kdeplot). A tuple gives the
+            (latitude, longitude) bandwidths in degrees directly
+        weight_column - str
+            The column each fire is weighted by (e.g. current_size). Every fire counts
+            once when None
+        cut - float
+            How many bandwidths the grid extends past the extreme locations
+    Returns:
+    ----------
+        density - np.array of shape (grid_size, grid_size), the density (integrating to 1)
+            at every (latitude, longitude) grid point
+        latitudes, longitudes - np.array of the grid coordinates
+    """
+    assert isinstance(dataframe, pd.DataFrame), "dataframe input must be a pandas Dataframe datatype"
+    assert isinstance(column_names, list) and len(column_names) == 2, "column_names input must be the latitude and longitude columns"
+    assert isinstance(grid_size, int) and grid_size > 1, "grid_size input must be an integer > 1"
+    assert weight_column is None or weight_column in dataframe.columns, "weight_column must be a column of the dataframe"
+
+    points = dataframe[column_names].to_numpy(dtype=float)
+    weights = np.ones(len(points)) if weight_column is None else dataframe[weight_column].to_numpy(dtype=float)
+    valid = ~np.isnan(points).any(axis=1) & ~np.isnan(weights) & (weights > 0)
+    points, weights = points[valid], weights[valid]
+    assert len(points) > 0, "No fire has a location (and a positive weight)"
+
+    if isinstance(bandwidth, (list, tuple)):
+        bandwidths = np.asarray(bandwidth, dtype=float)
+    else:
+        bandwidths = np.array([get_kde_bandwidth(points[:, axis], weights, bandwidth) for axis in range(2)])
+    lows = points.min(axis=0) - cut * bandwidths
+    highs = points.max(axis=0) + cut * bandwidths
+    axes = [np.linspace(lows[axis], highs[axis], grid_size) for axis in range(2)]
+    steps = (highs - lows) / (grid_size - 1)
+
+    # bin every fire to its nearest grid point
+    edges = [np.concatenate(([-np.inf], (grid_axis[:-1] + grid_axis[1:]) / 2, [np.inf])) for grid_axis in axes]
+    counts, _, _ = np.histogram2d(points[:, 0], points[:, 1], bins=edges, weights=weights)
+
+    # separable gaussian kernel over every offset between two grid points, convolved on a
+    # zero padded grid so the density does not wrap around the edges
+    offsets = np.arange(-(grid_size - 1), grid_size)
+    kernels = [np.exp(-0.5 * (offsets * steps[axis] / bandwidths[axis]) ** 2) / (np.sqrt(2 * np.pi) * bandwidths[axis])
+               for axis in range(2)]
+    kernel = np.outer(kernels[0], kernels[1])
+    shape = (2 * grid_size - 1 + grid_size - 1,) * 2
+    convolved = np.fft.irfft2(np.fft.rfft2(counts, shape) * np.fft.rfft2(kernel, shape), shape)
+    density = convolved[grid_size - 1:2 * grid_size - 1, grid_size - 1:2 * grid_size - 1] / weights.sum()
+    return np.clip(density, 0, None), axes[0], axes[1]
 
-def seaborn_plot_latlong_heatmap(dataframe, column_names):
+def seaborn_plot_latlong_heatmap(dataframe, column_names, grid_size = 200, bandwidth = "scott", weight_column = None):
     '''A customized function used to plot
     the latitude and longitude as a heat map
-    on a set of coordinate axes'''
+    on a set of coordinate axes. The density
+    is estimated on a grid by get_kde_grid()
+    and returned with the grid coordinates.'''
     assert isinstance(dataframe, pd.DataFrame), "dataframe input must be a pandas Dataframe datatype"
     assert isinstance(column_names, list)
 
-
-    sns.kdeplot(data=dataframe[[column_names[1],column_names[0]]], x=column_names[1], y=column_names[0], fill=True)
+    density, latitudes, longitudes = get_kde_grid(dataframe, column_names, grid_size, bandwidth, weight_column)
+    # filled contours of the density, like sns.kdeplot(fill=True) with the longitude on x
+    fig, ax = plt.subplots()
+    levels = np.linspace(density.max() * 0.05, density.max(), 10)
+    ax.contourf(longitudes, latitudes, density, levels=levels, cmap=sns.color_palette("rocket_r", as_cmap=True))
+    ax.set_xlabel(column_names[1])
+    ax.set_ylabel(column_names[0])
+    return density, latitudes, longitudes
 
 def pca_display(dataframe, column_names):
     '''A function to perform PCA on a limited number of 
@@ -203,11 +465,145 @@ def pca_display(dataframe, column_names):
     plt.xlim(0, 5)
     plt.show
 
+def get_category_codes(dataframe, column_names, missing_label = "Other"):
+    """
+    Codes the values of every column as integers 0..k-1 (its categories sorted), in one
+    pass over each column
+
+    Parameters:
+    ------------
+        dataframe - pd.Dataframe
+            a dataframe of the dataset
+        column_names - list of str
+            The categorical columns to code
+        missing_label - str
+            The category missing values are counted in. Missing values are coded -1
+            (and left out of the contingency tables) when None
+    Returns:
+    ----------
+        a dict of the codes (np.array) and a dict of the category labels of every column
+    """
+    codes = {}
+    labels = {}
+    for column in column_names:
+        column_codes, uniques = pd.factorize(dataframe[column], sort=True)
+        uniques = list(uniques)
+        if missing_label is not None and (column_codes < 0).any():
+            # missing values join the missing_label category when the column already has it
+            if missing_label in uniques:
+                missing_code = uniques.index(missing_label)
+            else:
+                missing_code = len(uniques)
+                uniques.append(missing_label)
+            column_codes = np.where(column_codes < 0, missing_code, column_codes)
+        codes[column] = column_codes
+        labels[column] = uniques
+    return codes, labels
+
+def get_pair_counts(row_codes, column_codes, row_count, column_count):
+    """
+    Counts the fires of every (row category, column category) pair with one bincount of
+    the combined codes, leaving out the fires coded -1 in either column
+    """
+    known = (row_codes >= 0) & (column_codes >= 0)
+    pair_codes = row_codes[known].astype(np.int64) * column_count + column_codes[known]
+    return np.bincount(pair_codes, minlength=row_count * column_count).reshape(row_count, column_count)
+
+@Results.Cached_result
+def get_contingency_table(dataframe, column_names, missing_label = "Other", fill_rows = True):
+    """
+    Returns the (cached, see Result_cache_utils) contingency table of two columns, with
+    the values of column_names[1] as rows and those of column_names[0] as columns.
+    Missing values are counted as missing_label (left out when None). When fill_rows
+    is False, the fires missing column_names[1] are left out, as pd.crosstab does.
+    Like pd.crosstab, values that no counted fire has are not listed
+    """
+    assert isinstance(dataframe, pd.DataFrame), "Please provide a dataframe"
+    assert isinstance(column_names, (list, tuple)) and len(column_names) == 2, "Provide two columns"
+    assert isinstance(fill_rows, bool), "fill_rows must be a bool"
+    codes, labels = get_category_codes(dataframe, [column_names[0]], missing_label)
+    row_codes, row_labels = get_category_codes(dataframe, [column_names[1]], missing_label if fill_rows else None)
+    codes.update(row_codes)
+    labels.update(row_labels)
+    counts = get_pair_counts(codes[column_names[1]], codes[column_names[0]],
+                             len(labels[column_names[1]]), len(labels[column_names[0]]))
+    table = pd.DataFrame(counts, index=pd.Index(labels[column_names[1]], name=column_names[1]),
+                         columns=pd.Index(labels[column_names[0]], name=column_names[0]))
+    return table.loc[table.sum(axis=1) > 0, table.sum(axis=0) > 0]
+
+@Results.Cached_result
+def get_association_matrix(dataframe, column_names, missing_label = "Other", bias_correction = False):
+    """
+    Measures the association of every pair of categorical columns: the categories of
+    each column are coded once, and the contingency table of every pair is counted from
+    the codes, from which the chi-square statistic and Cramer's V are computed. The
+    dataframe is not modified
+
+    Parameters:
+    ------------
+        dataframe - pd.Dataframe
+            a dataframe of the dataset
+        column_names - list of str
+            The categorical columns to compare
+        missing_label - str
+            The category missing values are counted in. Fires missing either value are
+            left out of a pair when None
+        bias_correction - bool
+            Whether to use the bias corrected Cramer's V (Bergsma, 2013), which does not
+            overstate the association of columns with many categories
+    Returns:
+    ----------
+        the Cramer's V of every pair as a symmetric pd.Dataframe (1 on the diagonal), and
+        a pd.Dataframe with the number of fires, chi-square, degrees of freedom and
+        Cramer's V of every pair
+    """
+    assert isinstance(dataframe, pd.DataFrame), "dataframe input must be a pandas Dataframe datatype"
+    assert isinstance(column_names, list) and len(column_names) > 1 and all([i in dataframe.columns for i in column_names]), "column_names input must be a list of at least two columns of the dataframe"
+    assert isinstance(bias_correction, bool), "bias_correction input must be a bool"
+
+    codes, labels = get_category_codes(dataframe, column_names, missing_label)
+    matrix = pd.DataFrame(np.eye(len(column_names)), index=column_names, columns=column_names)
+    pairs = []
+    for i, row_column in enumerate(column_names):
+        for column in column_names[i + 1:]:
+            counts = get_pair_counts(codes[row_column], codes[column], len(labels[row_column]), len(labels[column]))
+            # categories without any fire in this pair do not count
+            counts = counts[counts.sum(axis=1) > 0][:, counts.sum(axis=0) > 0]
+            total = counts.sum()
+            rows, columns = counts.shape
+            expected = np.outer(counts.sum(axis=1), counts.sum(axis=0)) / max(total, 1)
+            chi_square = np.sum((counts - expected) ** 2 / np.where(expected > 0, expected, 1))
+            phi_square = chi_square / total if total else np.nan
+            if bias_correction and total > 1:
+                phi_square = max(0.0, phi_square - (rows - 1) * (columns - 1) / (total - 1))
+                rows -= (rows - 1) ** 2 / (total - 1)
+                columns -= (columns - 1) ** 2 / (total - 1)
+            smaller = min(rows, columns) - 1
+            cramers_v = np.sqrt(phi_square / smaller) if smaller > 0 else np.nan
+            matrix.loc[row_column, column] = matrix.loc[column, row_column] = cramers_v
+            pairs.append({'column_1': row_column, 'column_2': column, 'count': int(total),
+                          'chi_square': chi_square, 'degrees_of_freedom': (counts.shape[0] - 1) * (counts.shape[1] - 1),
+                          'cramers_v': cramers_v})
+    return matrix, pd.DataFrame(pairs)
+
+def plot_association_matrix(dataframe, column_names, missing_label = "Other", bias_correction = False):
+    """
+    Plots the Cramer's V of every pair of categorical columns (see get_association_matrix())
+    as a heatmap, and returns the matrix
+    """
+    matrix, _ = get_association_matrix(dataframe, column_names, missing_label, bias_correction)
+    plt.figure(figsize=(10, 8))
+    sns.heatmap(matrix, annot=True, cmap='YlGnBu', fmt='.2f', vmin=0, vmax=1)
+    plt.title("Association between the columns (Cramer's V)")
+    plt.show()
+    return matrix
+
 def plot_correlation(dataframe, column_names):
         
         """
         Given two columns plots the correlation or the contingency table 
-        between the two columns
+        between the two columns. Missing values of column_names[0] are
+        counted as 'Other', the fires missing column_names[1] are left out
         """
 
         assert isinstance(dataframe, pd.DataFrame), "Please provide a dataframe"
@@ -215,13 +611,12 @@ def plot_correlation(dataframe, column_names):
         assert len(column_names) == 2, "Provide two columns"
         assert all( isinstance(col, str) and len(col) > 0 and col in dataframe.columns for col in column_names ), "Provide valid column names"
 
-        dataframe[column_names[0]] = dataframe[column_names[0]].fillna('Other')
         # Create a contingency table
-        contingency_table = pd.crosstab(dataframe[column_names[1]], dataframe[column_names[0]])
+        contingency_table = get_contingency_table(dataframe, column_names, missing_label='Other', fill_rows=False)
         # Plot heatmap
         plt.figure(figsize=(10, 8))
         sns.heatmap(contingency_table, annot=True, cmap='YlGnBu', fmt='d')
-        plt.title('Relationship between Fire Type and Fuel Type')
-        plt.xlabel('Fuel Type')
-        plt.ylabel('Fire Type')
-        plt.show()
\ No newline at end of file
+        plt.title(f"Relationship between {column_names[1]} and {column_names[0]}")
+        plt.xlabel(column_names[0])
+        plt.ylabel(column_names[1])
+        plt.show()
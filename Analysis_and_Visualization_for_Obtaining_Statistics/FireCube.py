@@ -0,0 +1,171 @@
+"""
+Created on October 18, 2026
+
+The goal of this script is to keep a precomputed cube of the burned hectares
+over the dimensions our analysis slices again and again (year, cause, fuel,
+weather, origin, fire type and responsible group). The fires are aggregated
+once into one cell per combination of these dimensions; roll-up, drill-down
+and filter queries are then answered from the cells, whose number depends on
+the distinct combinations and not on the number of fires. The cube can be
+saved, and updated with new (or removed) fires without rebuilding it.
+"""
+
+from Data_Extracting_and_Cleaning.Utils import Cache_utils as Cache
+import pandas as pd
+import numpy as np
+
+CUBE_DIMENSIONS = ['calendar_year', 'general_cause_desc', 'fuel_type', 'weather_conditions_over_fire',
+                   'fire_origin', 'fire_type', 'responsible_group_desc']
+MEASURE_COLUMN = 'ex_hectares'
+
+
+def build_fire_cube(dataframe, dimensions = CUBE_DIMENSIONS, measure_column = MEASURE_COLUMN):
+    """
+    Aggregates the fires into one cell per combination of the dimensions
+
+    Parameters:
+    ------------
+        dataframe - pd.Dataframe
+            a dataframe of the dataset
+        dimensions - list of str
+            The columns the fires are sliced by. Missing values are a value of their own
+        measure_column - str
+            The column of burned hectares that is summed and averaged
+    Returns:
+    ----------
+        a dict with the 'dimensions', the 'measure' and the 'cells': a pd.Dataframe of
+        every combination of dimension values with its number of fires ('count'), the sum
+        of their hectares and the number of fires whose hectares are known
+    """
+    assert isinstance(dataframe, pd.DataFrame), "dataframe input must be a pandas Dataframe datatype"
+    assert isinstance(dimensions, list) and len(dimensions) > 0 and all([i in dataframe.columns for i in dimensions]), "dimensions input must be a list of columns of the dataframe"
+    assert isinstance(measure_column, str) and measure_column in dataframe.columns, "measure_column input must be a column of the dataframe"
+
+    measures = pd.DataFrame({dimension: dataframe[dimension] for dimension in dimensions})
+    measures['count'] = 1
+    measures[f"{measure_column}_sum"] = dataframe[measure_column].fillna(0).astype(float)
+    measures[f"{measure_column}_count"] = dataframe[measure_column].notna().astype(np.int64)
+    cells = measures.groupby(dimensions, sort=False, dropna=False, observed=True).sum().reset_index()
+    return {'dimensions': list(dimensions), 'measure': measure_column, 'cells': cells, 'cuboids': {}}
+
+def get_measure_columns(cube):
+    """
+    Returns the names of the additive measures held by every cell of the cube
+    """
+    return ['count', f"{cube['measure']}_sum", f"{cube['measure']}_count"]
+
+def query_fire_cube(cube, dimensions, filters = None):
+    """
+    Aggregates the cells of the cube over some of its dimensions: fewer dimensions
+    roll the cube up, more drill down, and filters slice it
+
+    Parameters:
+    ------------
+        cube - dict
+            The cube of build_fire_cube()
+        dimensions - list of str
+            The dimensions kept in the result. An empty list gives the grand total
+        filters - dict
+            The values (a value or a list of them) each filtered dimension must have
+    Returns:
+    ----------
+        a pd.Dataframe indexed by the dimensions, with the number of fires ('count') and
+        the sum and mean of the burned hectares of every combination
+    """
+    assert isinstance(dimensions, list) and all([i in cube['dimensions'] for i in dimensions]), "dimensions input must be a list of dimensions of the cube"
+    assert filters is None or (isinstance(filters, dict) and all([i in cube['dimensions'] for i in filters])), "filters input must be a dict of dimensions of the cube"
+
+    # queries without filters are kept, so rolling up or drilling back is free
+    cuboid_key = tuple(dimensions)
+    if not filters and cuboid_key in cube['cuboids']:
+        return cube['cuboids'][cuboid_key].copy()
+
+    cells = cube['cells']
+    if filters:
+        keep = np.ones(len(cells), dtype=bool)
+        for dimension, values in filters.items():
+            values = values if isinstance(values, (list, tuple, set)) else [values]
+            keep &= cells[dimension].isin(values).to_numpy()
+        cells = cells[keep]
+
+    measure_columns = get_measure_columns(cube)
+    if dimensions:
+        result = cells.groupby(dimensions, sort=True, dropna=False, observed=True)[measure_columns].sum()
+    else:
+        result = cells[measure_columns].sum().to_frame().T.astype(cells[measure_columns].dtypes.to_dict())
+    known_hectares = result[f"{cube['measure']}_count"]
+    result[f"{cube['measure']}_mean"] = (result[f"{cube['measure']}_sum"] / known_hectares).where(known_hectares > 0)
+    result = result.drop(columns=[f"{cube['measure']}_count"])
+
+    if not filters:
+        cube['cuboids'][cuboid_key] = result.copy()
+    return result
+
+def roll_up_fire_cube(cube, dimensions, dimension, filters = None):
+    """
+    Rolls a query of the cube up by removing one of its dimensions (see query_fire_cube())
+    """
+    assert dimension in dimensions, "dimension must be one of the queried dimensions"
+    return query_fire_cube(cube, [i for i in dimensions if i != dimension], filters)
+
+def drill_down_fire_cube(cube, dimensions, dimension, filters = None):
+    """
+    Drills a query of the cube down by adding one more dimension (see query_fire_cube())
+    """
+    assert dimension in cube['dimensions'] and dimension not in dimensions, "dimension must be a dimension of the cube that is not queried yet"
+    return query_fire_cube(cube, dimensions + [dimension], filters)
+
+def update_fire_cube(cube, added = None, removed = None):
+    """
+    Updates the cube with new fires and/or fires taken out (e.g. the old version of
+    corrected records), by aggregating only those fires and merging their cells in
+
+    Parameters:
+    ------------
+        cube - dict
+            The cube of build_fire_cube()
+        added - pd.Dataframe
+            The fires to add
+        removed - pd.Dataframe
+            The fires to take out, as they were when they were added
+    Returns:
+    ----------
+        the updated cube (a new dict, the given cube is not modified)
+    """
+    assert added is None or isinstance(added, pd.DataFrame), "added input must be a pandas Dataframe datatype"
+    assert removed is None or isinstance(removed, pd.DataFrame), "removed input must be a pandas Dataframe datatype"
+
+    measure_columns = get_measure_columns(cube)
+    frames = [cube['cells']]
+    if added is not None and len(added):
+        frames.append(build_fire_cube(added, cube['dimensions'], cube['measure'])['cells'])
+    if removed is not None and len(removed):
+        removed_cells = build_fire_cube(removed, cube['dimensions'], cube['measure'])['cells']
+        removed_cells[measure_columns] = -removed_cells[measure_columns]
+        frames.append(removed_cells)
+
+    # categoricals of different categories are concatenated as plain values
+    cells = pd.concat(frames, ignore_index=True, sort=False)
+    cells = cells.groupby(cube['dimensions'], sort=False, dropna=False, observed=True)[measure_columns].sum().reset_index()
+    cells = cells[cells['count'] > 0].reset_index(drop=True)
+    return {'dimensions': cube['dimensions'], 'measure': cube['measure'], 'cells': cells, 'cuboids': {}}
+
+def save_fire_cube(cube, cube_path):
+    """
+    Writes the cells of the cube to a Parquet file (requires pyarrow)
+    """
+    assert isinstance(cube_path, str), "cube_path input must be a str"
+    assert Cache.Save_cached_df(cube['cells'], cube_path), f"Could not write the cube '{cube_path}'."
+
+def load_fire_cube(cube_path, measure_column = MEASURE_COLUMN):
+    """
+    Reads a cube written by save_fire_cube(). Its dimensions are the columns of the
+    cells that are not measures
+    """
+    assert isinstance(cube_path, str), "cube_path input must be a str"
+    cells = Cache.Load_cached_df(cube_path)
+    assert cells is not None, f"Could not read the cube '{cube_path}'."
+    measure_columns = ['count', f"{measure_column}_sum", f"{measure_column}_count"]
+    assert all([i in cells.columns for i in measure_columns]), f"The cube was not built with the measure '{measure_column}'."
+    dimensions = [i for i in cells.columns if i not in measure_columns]
+    return {'dimensions': dimensions, 'measure': measure_column, 'cells': cells, 'cuboids': {}}
@@ -0,0 +1,168 @@
+"""
+Created on October 18, 2026
+
+The goal of this script is to answer proximity questions about the fire
+locations (e.g. all fires within 25 km of a community, or inside a bounding
+box) without scanning every fire for every query. The locations are indexed
+once per version of the data in a ball tree on the haversine distance, which
+answers radius and k-nearest queries for whole batches of query points.
+"""
+
+from Data_Extracting_and_Cleaning.Utils import Cache_utils as Cache
+from sklearn.neighbors import BallTree
+import pandas as pd
+import numpy as np
+import os
+
+# Mean radius of the earth in kilometers
+EARTH_RADIUS_KM = 6371.0088
+LOCATION_COLUMNS = ['fire_location_latitude', 'fire_location_longitude']
+
+# spatial indexes already built, keyed by a fingerprint of the indexed locations
+_spatial_indexes = {}
+
+
+def build_spatial_index(dataframe, column_names = LOCATION_COLUMNS):
+    """
+    Indexes the locations of the fires. Fires without a location are not indexed.
+
+    Parameters:
+    ------------
+        dataframe - pd.Dataframe
+            a dataframe of the dataset
+        column_names - list of str
+            The latitude and longitude columns, in degrees
+    Returns:
+    ----------
+        a dict with the ball tree of the locations ('tree'), the row position in the
+        dataframe of every indexed fire ('positions') and the positions ordered by
+        latitude for bounding box queries
+    """
+    assert isinstance(dataframe, pd.DataFrame), "dataframe input must be a pandas Dataframe datatype"
+    assert isinstance(column_names, list) and len(column_names) == 2 and all([i in dataframe.columns for i in column_names]), "column_names must be the latitude and longitude columns of the dataframe"
+
+    latitudes = dataframe[column_names[0]].to_numpy(dtype=float)
+    longitudes = dataframe[column_names[1]].to_numpy(dtype=float)
+    positions = np.flatnonzero(~(np.isnan(latitudes) | np.isnan(longitudes)))
+    latitudes, longitudes = latitudes[positions], longitudes[positions]
+
+    latitude_order = np.argsort(latitudes, kind='stable')
+    return {'tree': BallTree(np.radians(np.column_stack([latitudes, longitudes])), metric='haversine'),
+            'positions': positions,
+            'sorted_latitudes': latitudes[latitude_order],
+            'sorted_longitudes': longitudes[latitude_order],
+            'sorted_positions': positions[latitude_order]}
+
+def get_spatial_index(dataframe, column_names = LOCATION_COLUMNS, cache_dir = None):
+    """
+    Returns the spatial index of build_spatial_index(), building it only once per
+    version of the data: the index is kept in memory, and also in 'cache_dir' when
+    given, under a fingerprint of the location columns.
+    """
+    assert isinstance(dataframe, pd.DataFrame), "dataframe input must be a pandas Dataframe datatype"
+    assert cache_dir is None or isinstance(cache_dir, str), "cache_dir must be a str"
+
+    fingerprint = Cache.Get_df_fingerprint(dataframe, column_names)
+    cache_path = None
+    if cache_dir is not None:
+        cache_path = os.path.join(cache_dir, f"spatial_index-{fingerprint[:16]}.pkl")
+    return Cache.Get_latest_version(_spatial_indexes, fingerprint,
+                                    lambda: build_spatial_index(dataframe, column_names), cache_path)
+
+def get_query_points(latitudes, longitudes):
+    """
+    Returns the query points as an (n, 2) array in radians, and whether a single
+    point (rather than a batch) was given.
+    """
+    single = np.ndim(latitudes) == 0
+    latitudes = np.atleast_1d(np.asarray(latitudes, dtype=float))
+    longitudes = np.atleast_1d(np.asarray(longitudes, dtype=float))
+    assert latitudes.shape == longitudes.shape and latitudes.ndim == 1, "latitudes and longitudes must have the same length"
+    assert not (np.isnan(latitudes).any() or np.isnan(longitudes).any()), "query points must not be nan"
+    return np.radians(np.column_stack([latitudes, longitudes])), single
+
+def query_radius(spatial_index, latitudes, longitudes, radius_km, return_distance = False):
+    """
+    Finds the fires within a distance of one or many query points.
+
+    Parameters:
+    ------------
+        spatial_index - dict
+            The index of get_spatial_index()
+        latitudes, longitudes - float or array of float
+            The query point(s), in degrees
+        radius_km - float or array of float
+            The search radius in kilometers, one for all points or one per point
+        return_distance - bool
+            Whether to also return the distances, with the fires sorted by distance
+    Returns:
+    ----------
+        the row positions (for dataframe.iloc) of the fires found, as an array for a
+        single query point or a list of arrays for a batch, and their distances in
+        kilometers when return_distance is True
+    """
+    assert isinstance(return_distance, bool), "return_distance input must be a bool"
+    assert np.all(np.asarray(radius_km) >= 0), "radius_km must be >= 0"
+    points, single = get_query_points(latitudes, longitudes)
+    radius = np.broadcast_to(np.asarray(radius_km, dtype=float) / EARTH_RADIUS_KM, len(points)).copy()
+
+    if return_distance:
+        neighbours, distances = spatial_index['tree'].query_radius(points, radius, return_distance=True,
+                                                                   sort_results=True)
+        distances = [distance * EARTH_RADIUS_KM for distance in distances]
+    else:
+        neighbours = spatial_index['tree'].query_radius(points, radius)
+    positions = [spatial_index['positions'][neighbour] for neighbour in neighbours]
+
+    if single:
+        return (positions[0], distances[0]) if return_distance else positions[0]
+    return (positions, distances) if return_distance else positions
+
+def query_nearest(spatial_index, latitudes, longitudes, k = 1):
+    """
+    Finds the k nearest fires of one or many query points.
+
+    Parameters:
+    ------------
+        spatial_index - dict
+            The index of get_spatial_index()
+        latitudes, longitudes - float or array of float
+            The query point(s), in degrees
+        k - int
+            Number of fires to find per query point
+    Returns:
+    ----------
+        the row positions (for dataframe.iloc) and the distances in kilometers of the
+        nearest fires, nearest first, as arrays of shape (k,) for a single query
+        point or (n, k) for a batch
+    """
+    assert isinstance(k, int) and 0 < k <= len(spatial_index['positions']), "k must be an integer between 1 and the number of indexed fires"
+    points, single = get_query_points(latitudes, longitudes)
+
+    distances, neighbours = spatial_index['tree'].query(points, k=k)
+    positions = spatial_index['positions'][neighbours]
+    distances = distances * EARTH_RADIUS_KM
+    if single:
+        return positions[0], distances[0]
+    return positions, distances
+
+def query_bbox(spatial_index, min_latitude, min_longitude, max_latitude, max_longitude):
+    """
+    Finds the fires inside a latitude/longitude bounding box (borders included).
+    Only the fires within the latitude range are checked, found by binary search.
+    A min_longitude greater than max_longitude is a box crossing the antimeridian.
+
+    Returns:
+    ----------
+        the row positions (for dataframe.iloc) of the fires found, in increasing order
+    """
+    assert min_latitude <= max_latitude, "min_latitude must be <= max_latitude"
+
+    start = np.searchsorted(spatial_index['sorted_latitudes'], min_latitude, side='left')
+    stop = np.searchsorted(spatial_index['sorted_latitudes'], max_latitude, side='right')
+    longitudes = spatial_index['sorted_longitudes'][start:stop]
+    if min_longitude <= max_longitude:
+        inside = (longitudes >= min_longitude) & (longitudes <= max_longitude)
+    else:
+        inside = (longitudes >= min_longitude) | (longitudes <= max_longitude)
+    return np.sort(spatial_index['sorted_positions'][start:stop][inside])
@@ -0,0 +1,180 @@
+"""
+Created on October 18, 2026
+
+The goal of this script is to keep daily, weekly and fire season counts and
+burned hectares of the fires, along with trailing windows (e.g. the last 7 and
+30 days), up to date as fire reports arrive. Every new fire updates the totals
+in constant time instead of recomputing them over the whole history, and the
+historical data can be replayed in the order it was reported to follow how a
+season unfolded as if it were live.
+"""
+
+import pandas as pd
+import numpy as np
+
+# The Alberta wildfire season runs from March 1 to October 31
+FIRE_SEASON_MONTHS = (3, 10)
+WINDOW_DAYS = (7, 30)
+
+
+def create_time_series_state(windows = WINDOW_DAYS):
+    """
+    Returns an empty time series state to update with update_time_series()
+
+    Parameters:
+    ------------
+        windows - list of int
+            The lengths (in days) of the trailing windows to keep
+    Returns:
+    ----------
+        a dict with the [count, hectares] of every day, week (keyed by its Monday) and
+        fire season (keyed by its year), and the totals of every trailing window
+    """
+    assert isinstance(windows, (list, tuple)) and all([isinstance(i, int) and i > 0 for i in windows]), "windows input must be a list of positive integers"
+    return {'daily': {}, 'weekly': {}, 'season': {}, 'latest_day': None, 'skipped': 0,
+            'windows': {days: {'start': None, 'count': 0, 'hectares': 0.0} for days in windows}}
+
+def update_time_series(state, fire_time, hectares = 0.0):
+    """
+    Adds one fire to the state, in constant time (amortized over the days the trailing
+    windows move forward). Fires may arrive late: a fire older than the latest one is
+    still added to its day, week and season, and to the windows it falls within
+
+    Parameters:
+    ------------
+        state - dict
+            The state of create_time_series_state()
+        fire_time - pd.Timestamp
+            The time of the fire (e.g. its fire_start_date or reported_date). Fires
+            without a time are only counted as 'skipped'
+        hectares - float
+            The burned hectares of the fire. Missing hectares count as 0
+    Returns:
+    ----------
+        the updated state
+    """
+    if pd.isna(fire_time):
+        state['skipped'] += 1
+        return state
+    fire_time = pd.Timestamp(fire_time)
+    hectares = 0.0 if pd.isna(hectares) else float(hectares)
+    day = fire_time.toordinal()
+
+    for totals, key in [(state['daily'], day), (state['weekly'], day - fire_time.weekday())]:
+        add_to_totals(totals, key, hectares)
+    if FIRE_SEASON_MONTHS[0] <= fire_time.month <= FIRE_SEASON_MONTHS[1]:
+        add_to_totals(state['season'], fire_time.year, hectares)
+
+    if state['latest_day'] is None or day > state['latest_day']:
+        advance_windows(state, day)
+    for window in state['windows'].values():
+        if day >= window['start']:
+            window['count'] += 1
+            window['hectares'] += hectares
+    return state
+
+def add_to_totals(totals, key, hectares):
+    """
+    Adds one fire to the [count, hectares] of a day, week or season
+    """
+    if key in totals:
+        totals[key][0] += 1
+        totals[key][1] += hectares
+    else:
+        totals[key] = [1, hectares]
+
+def advance_windows(state, day):
+    """
+    Moves the trailing windows forward so they end on 'day', taking out the days that
+    leave them. The fires of 'day' are added by update_time_series()
+    """
+    daily = state['daily']
+    for days, window in state['windows'].items():
+        start = day - days + 1
+        if window['start'] is None or start - window['start'] >= days:
+            # no day of the old window is left: sum the days of the new one
+            window['count'] = sum(daily[i][0] for i in range(start, day) if i in daily)
+            window['hectares'] = sum(daily[i][1] for i in range(start, day) if i in daily)
+        else:
+            for i in range(window['start'], start):
+                if i in daily:
+                    window['count'] -= daily[i][0]
+                    window['hectares'] -= daily[i][1]
+        window['start'] = start
+    state['latest_day'] = day
+
+def get_window_totals(state):
+    """
+    Returns the number of fires and burned hectares of every trailing window, ending on
+    the day of the latest fire
+
+    Returns:
+    ----------
+        a pd.Dataframe indexed by the window length in days
+    """
+    return pd.DataFrame({'count': {days: window['count'] for days, window in state['windows'].items()},
+                         'hectares': {days: window['hectares'] for days, window in state['windows'].items()}},
+                        columns=['count', 'hectares']).rename_axis('window_days')
+
+def get_time_series(state, frequency = "daily"):
+    """
+    Returns the number of fires and burned hectares of every day, week or fire season
+
+    Parameters:
+    ------------
+        state - dict
+            The state of update_time_series()
+        frequency - str
+            "daily", "weekly" (indexed by the Monday of the week) or "season" (indexed by year)
+    Returns:
+    ----------
+        a pd.Dataframe with the 'count' and 'hectares' of every period, in time order
+    """
+    assert frequency in ["daily", "weekly", "season"], "frequency input must be daily, weekly or season"
+    totals = state[frequency]
+    keys = sorted(totals)
+    if frequency == "season":
+        index = pd.Index(keys, name='fire_season')
+    else:
+        index = pd.DatetimeIndex([pd.Timestamp.fromordinal(key) for key in keys], name='date')
+    values = np.array([totals[key] for key in keys], dtype=float).reshape(-1, 2)
+    return pd.DataFrame({'count': values[:, 0].astype(np.int64), 'hectares': values[:, 1]}, index=index)
+
+def replay_fires(dataframe, time_column = "reported_date", order_column = "reported_date",
+                 measure_column = "ex_hectares", windows = WINDOW_DAYS, state = None):
+    """
+    Streams the fires of the dataframe into a time series state in the order they were
+    reported, yielding after every fire so a season can be followed as it unfolded
+
+    Parameters:
+    ------------
+        dataframe - pd.Dataframe
+            a dataframe of the dataset
+        time_column - str
+            The time the fires are aggregated on (e.g. fire_start_date or reported_date)
+        order_column - str
+            The time the fires arrive in. Fires without it are streamed last
+        measure_column - str
+            The column of burned hectares
+        windows - list of int
+            The trailing windows of a new state
+        state - dict
+            A state to continue from (e.g. the history before the current season)
+    Returns:
+    ----------
+        a generator of (fire number in the stream, arrival time, state) after every fire.
+        The state is updated in place, so read what is needed from it before the next
+        fire, or exhaust the generator to get the final totals
+    """
+    assert isinstance(dataframe, pd.DataFrame), "dataframe input must be a pandas Dataframe datatype"
+    assert all([i in dataframe.columns for i in [time_column, order_column, measure_column]]), "time_column, order_column and measure_column must be columns of the dataframe"
+    if state is None:
+        state = create_time_series_state(windows)
+
+    order = np.argsort(dataframe[order_column].to_numpy(), kind='stable')
+    fire_times = dataframe[time_column].to_numpy()[order]
+    arrival_times = dataframe[order_column].to_numpy()[order]
+    hectares = dataframe[measure_column].to_numpy(dtype=float)[order]
+    for number, (fire_time, arrival_time, fire_hectares) in enumerate(zip(fire_times, arrival_times, hectares)):
+        update_time_series(state, fire_time, fire_hectares)
+        yield number, arrival_time, state
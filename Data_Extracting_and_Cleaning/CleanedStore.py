@@ -0,0 +1,153 @@
+"""
+Created on October 18, 2026
+
+The goal of this script is to keep a persisted store of the cleaned wildfire
+data that can be updated incrementally. New or corrected fire reports arrive
+as a small 'delta' csv, only those rows are cleaned (with the same rules as
+Get_all_data()) and merged into the store. The store is partitioned by
+calendar year, one Parquet file per year, so an update only rewrites the years
+the delta touches instead of the whole archive.
+"""
+
+from Data_Extracting_and_Cleaning import DataExtractionCleaning as dec
+from Data_Extracting_and_Cleaning.Utils import Cache_utils as Cache
+import pandas as pd
+import glob
+import os
+import re
+
+# Records are identified by their fire number within a calendar year
+KEY_COLUMNS = ['fire_number', 'calendar_year']
+PARTITION_COLUMN = 'calendar_year'
+
+
+def Get_partition_path(store_dir, year):
+    """
+    Returns the path of the Parquet file holding the fires of 'year'.
+    """
+    return os.path.join(store_dir, f"{PARTITION_COLUMN}={int(year)}.parquet")
+
+def Get_store_years(store_dir):
+    """
+    Returns the sorted list of years that have a partition in the store.
+    """
+    assert isinstance(store_dir, str), "store_dir must be a string."
+    pattern = re.compile(rf"{PARTITION_COLUMN}=(-?\d+)\.parquet")
+    years = []
+    for file_path in glob.glob(os.path.join(store_dir, f"{PARTITION_COLUMN}=*.parquet")):
+        match = pattern.fullmatch(os.path.basename(file_path))
+        if match:
+            years.append(int(match.group(1)))
+    return sorted(years)
+
+def Create_cleaned_store(df, store_dir):
+    """
+    Writes a cleaned dataframe (e.g. from Get_all_data()) to a new store, one Parquet
+    file per calendar year. Existing partitions of those years are replaced.
+
+    Parameters:
+        df - pd.DataFrame
+            The cleaned data. Must hold the KEY_COLUMNS.
+
+        store_dir - str
+            Directory of the store. Created if it does not exist.
+
+    Returns:
+        years - list
+            The years written to the store.
+    """
+    assert isinstance(df, pd.DataFrame), "Input must be a pandas dataframe."
+    assert isinstance(store_dir, str), "store_dir must be a string."
+    assert all(name in df.columns for name in KEY_COLUMNS), f"df must contain the key columns {KEY_COLUMNS}."
+    assert df[PARTITION_COLUMN].notna().all(), f"Every record must have a {PARTITION_COLUMN}."
+
+    years = []
+    for year, year_df in df.groupby(PARTITION_COLUMN, sort=True):
+        Write_partition(year_df, store_dir, year)
+        years.append(int(year))
+    return years
+
+def Load_cleaned_store(store_dir, years = None):
+    """
+    Loads the cleaned data from the store.
+
+    Parameters:
+        store_dir - str
+            Directory of the store.
+
+        years - list
+            Calendar years to load. All years are loaded when not given.
+
+    Returns:
+        df - pd.DataFrame
+            The cleaned data of the requested years, ordered by year.
+    """
+    assert isinstance(store_dir, str), "store_dir must be a string."
+    assert years is None or isinstance(years, (list, tuple)), "years must be entered in as a list."
+
+    if years is None:
+        years = Get_store_years(store_dir)
+    frames = [pd.read_parquet(Get_partition_path(store_dir, year))
+              for year in years if os.path.exists(Get_partition_path(store_dir, year))]
+    if not frames:
+        return pd.DataFrame()
+    return pd.concat(frames, ignore_index=True, sort=False)
+
+def Append_to_cleaned_store(delta_file_name, store_dir):
+    """
+    Cleans the records of a delta csv with the same rules as Get_all_data() and
+    merges them into the store. A record whose fire_number and calendar_year are
+    already in the store replaces the stored one (every stored row of that key, when
+    the store holds the key more than once), any other record is appended.
+    Only the partitions of the years found in the delta are read and rewritten.
+
+    Parameters:
+        delta_file_name - str
+            The raw filename (from 'Dataset/' directory) of the new/updated records.
+            Must have the same columns as the original database csv.
+
+        store_dir - str
+            Directory of the store.
+
+    Returns:
+        summary - dict
+            Number of 'added' and 'updated' records of the delta, and the number of
+            stored rows they replaced ('replaced_rows', more than 'updated' when some
+            keys were held by several stored rows).
+    """
+    assert isinstance(delta_file_name, str), "delta filename must be a string."
+    assert isinstance(store_dir, str), "store_dir must be a string."
+
+    delta_path = dec.Get_dataset_file_path(delta_file_name)
+    # text columns are read as strings so a small delta gets the same dtypes as the store
+    text_dtypes = dict.fromkeys(dec.RAW_TEXT_COLUMNS + dec.RAW_DATE_COLUMNS, str)
+    delta_df = dec.Clean_raw_data(pd.read_csv(delta_path, dtype=text_dtypes))
+    assert delta_df[PARTITION_COLUMN].notna().all(), f"Every delta record must have a {PARTITION_COLUMN}."
+
+    # a record updated twice in the same delta keeps its latest version
+    delta_df = delta_df.drop_duplicates(subset=KEY_COLUMNS, keep='last')
+
+    summary = {'added': 0, 'updated': 0, 'replaced_rows': 0}
+    for year, year_delta in delta_df.groupby(PARTITION_COLUMN, sort=True):
+        partition_path = Get_partition_path(store_dir, year)
+        year_df = year_delta
+        updated_count = 0
+        if os.path.exists(partition_path):
+            stored_df = pd.read_parquet(partition_path)
+            is_updated = stored_df['fire_number'].isin(year_delta['fire_number'])
+            # counted per record of the delta, as a stored key may be held by several rows
+            updated_count = int(year_delta['fire_number'].isin(stored_df['fire_number']).sum())
+            summary['replaced_rows'] += int(is_updated.sum())
+            year_df = pd.concat([stored_df[~is_updated], year_delta], ignore_index=True, sort=False)
+        summary['updated'] += updated_count
+        summary['added'] += len(year_delta) - updated_count
+        Write_partition(year_df, store_dir, year)
+    return summary
+
+def Write_partition(year_df, store_dir, year):
+    """
+    Writes the records of one calendar year to its partition file.
+    """
+    partition_path = Get_partition_path(store_dir, year)
+    assert Cache.Save_cached_df(year_df.reset_index(drop=True), partition_path), \
+    f"Could not write the store partition '{partition_path}'."
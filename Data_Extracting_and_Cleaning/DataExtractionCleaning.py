@@ -10,9 +10,21 @@ https://open.alberta.ca/opendata/wildfire-data-1996-2005
 """
 
 from Data_Extracting_and_Cleaning.Utils import Directory_utils as Dir
+from Data_Extracting_and_Cleaning.Utils import Cache_utils as Cache
+from Data_Extracting_and_Cleaning.Utils import Pipeline_utils as Pipe
 import pandas as pd
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import numpy as np
+import functools
+import glob
 import math
+import os
+import re
+import time
+import tracemalloc
 import folium
+from folium import plugins
+from branca.element import MacroElement, Template
 
 # ensure to include Pyarrow when installing pandas(?):
 """
@@ -25,87 +37,834 @@ DeprecationWarning:
 """
 # import Pyarrow
 
-def Get_all_data(file_name):
+# Bump this whenever a cleaning rule changes in a way the source fingerprints of
+# the cleaning stages would not catch (e.g. a change in a helper they call).
+CLEANING_VERSION = 1
+CACHE_DIRECTORY_NAME = '.cache'
+
+RAW_DATE_COLUMNS = [ 'assessment_datetime', 'fire_start_date','discovered_date', 
+                     'reported_date', 'start_for_fire_date', 'fire_fighting_start_date',
+                     'bh_fs_date', 'uc_fs_date', 'ex_fs_date', 'to_fs_date' ]
+RAW_TEXT_COLUMNS = [ 'fire_number', 'fire_name', 'size_class', 'fire_origin', 'general_cause_desc',
+                     'industry_identifier_desc', 'responsible_group_desc', 'activity_class',
+                     'true_cause', 'permit_detail_desc', 'det_agent_type', 'det_agent',
+                     'initial_action_by', 'fire_type', 'fire_position_on_slope',
+                     'weather_conditions_over_fire', 'fuel_type', 'other_fuel_type' ]
+
+# Timestamp formats tried, in order, when detecting the format of the date columns
+DATE_FORMATS = [ '%Y-%m-%d %H:%M:%S', '%Y-%m-%d %H:%M', '%Y-%m-%d', '%m/%d/%Y %H:%M:%S',
+                 '%m/%d/%Y %H:%M', '%m/%d/%Y', '%d/%m/%Y %H:%M:%S', '%d/%m/%Y %H:%M', '%d/%m/%Y' ]
+
+# Values that replace the nans of these columns during cleaning
+FILL_VALUES = { 'det_agent_type': "Unknown", 'det_agent': "Unknow", 'fire_fighting_start_size': 0,
+                'fire_position_on_slope': "Unknown", 'initial_action_by': "Unknown",
+                'industry_identifier_desc': "Non Industrial / Other Industry",
+                'responsible_group_desc': "Unknown", 'activity_class': "Unknown",
+                'weather_conditions_over_fire': "Unknown", 'general_cause_desc': "Restart" }
+
+# Raw columns that are dropped by the cleaning, so they are not even parsed
+UNUSED_COLUMNS = ['fire_year', 'permit_detail_desc']
+
+# Raw columns the cleaning of a column also needs, e.g. the nans of fire_start_date
+# are filled from start_for_fire_date.
+CLEANING_DEPENDENCIES = { 'fire_start_date': ['start_for_fire_date'],
+                          'fuel_type': ['other_fuel_type'],
+                          'other_fuel_type': ['fuel_type'] }
+
+# Intervals between the lifecycle dates of a fire, added to the cleaned data as
+# timedelta columns: name: (start of the interval, end of the interval)
+LIFECYCLE_INTERVALS = { 'detection_delay': ('fire_start_date', 'discovered_date'),
+                        'report_delay': ('discovered_date', 'reported_date'),
+                        'initial_attack_time': ('reported_date', 'fire_fighting_start_date'),
+                        'time_to_held': ('fire_fighting_start_date', 'bh_fs_date'),
+                        'time_to_under_control': ('fire_fighting_start_date', 'uc_fs_date'),
+                        'time_to_turned_over': ('fire_fighting_start_date', 'to_fs_date'),
+                        'time_to_extinguished': ('fire_fighting_start_date', 'ex_fs_date'),
+                        'fire_duration': ('fire_start_date', 'ex_fs_date') }
+CLEANING_DEPENDENCIES.update({name: list(dates) for name, dates in LIFECYCLE_INTERVALS.items()})
+
+# Coding the general cause according to the data dictionary
+genCauseMap = { "Other Industry":0, "Lightning":1, "Resident":2, 
+                "Forest Industry":3, "Railroad":4, "Prescribed Fire":5, 
+                "Recreation":6, "Incendiary":7, "Miscellaneous Known":8,
+                "Power Line Industry":9, "Oil & Gas Industry":10, "Restart":11,
+                "Undetermined":12}
+
+fuelTypeMap = { "C1": "spruce-lichen woodland",'C2': 'boreal spruce', 'C3': 'mature Jack or Lodgepole Pine','C4': 'immature Jack or Lodgepole Pine',
+                'C5': 'Red and White Pine', 'C6': 'conifer plantation Deciduous', 'D1': 'leafless Aspen Mixedwood', 'M1': 'boreal mixedwood - leafless',
+                'M2': 'boreal mixedwood - green', 'M3': 'dead Balsam fir mixedwood - leafless', 'M4': 'dead Balsam fir mixedwood-green Slash',
+                'S1': 'Jack or Lodgepole Pine slash', 'S2': 'White Spruce - Balsam slash Grass', 'O1a': 'matted grass', 'O1b': 'standing grass'}
+
+# Coding true cause
+trueCauseMap = { 'Abandoned Fire':1, 'Burning Substance':7, 'Unsafe Fire':2, 
+                 'Arson Suspected':12, 'Insufficient Buffer':5, 'Hot Exhaust':8, 
+                 'Unpredictable Event':9, 'Unattended Fire':4, 'Arson Known':10, 
+                 'High Hazard':11, 'Insufficient Resources':3, 'Flammable Fluids':6, 
+                 'Permit Related':0}
+
+# Numeric columns downcast to float32, whose ~7 significant digits cover the
+# precision these values are recorded with in the csv. The fire locations stay
+# float64: 6 decimals of a latitude/longitude need 8 significant digits (float32
+# steps are ~4e-6 degrees around 56 degrees).
+COMPACT_FLOAT_COLUMNS = [ 'assessment_hectares', 'current_size', 'fire_fighting_start_size',
+                          'bh_hectares', 'uc_hectares', 'to_hectares', 'ex_hectares' ]
+# Low cardinality text columns stored as categoricals. Columns with a code map use
+# the map (in code order) as their categories, any other value found is appended.
+COMPACT_CATEGORY_COLUMNS = {
+    'general_cause_desc': sorted(genCauseMap, key=genCauseMap.get),
+    'true_cause': sorted(trueCauseMap, key=trueCauseMap.get),
+    'fuel_type': list(fuelTypeMap.values()) + ["Other Fuel", "Unknown"],
+    'other_fuel_type': ["Known Fuel", "Unknown"],
+    'fire_type': [], 'weather_conditions_over_fire': [], 'det_agent_type': [], 'det_agent': [],
+    'responsible_group_desc': [], 'activity_class': [], 'fire_position_on_slope': [],
+    'size_class': [], 'fire_origin': [], 'initial_action_by': [], 'industry_identifier_desc': [] }
+
+# Every rule table the cleaning reads, part of the cache key of the cleaned frame so
+# editing a table (e.g. a default of FILL_VALUES) rebuilds the cache like a code change
+CLEANING_RULE_TABLES = { 'RAW_DATE_COLUMNS': RAW_DATE_COLUMNS, 'RAW_TEXT_COLUMNS': RAW_TEXT_COLUMNS,
+                         'DATE_FORMATS': DATE_FORMATS, 'FILL_VALUES': FILL_VALUES,
+                         'UNUSED_COLUMNS': UNUSED_COLUMNS, 'CLEANING_DEPENDENCIES': CLEANING_DEPENDENCIES,
+                         'LIFECYCLE_INTERVALS': LIFECYCLE_INTERVALS, 'fuelTypeMap': fuelTypeMap,
+                         'COMPACT_FLOAT_COLUMNS': COMPACT_FLOAT_COLUMNS,
+                         'COMPACT_CATEGORY_COLUMNS': COMPACT_CATEGORY_COLUMNS }
+
+def Get_all_data(file_name, use_cache = True, cache_dir = None, compact = False, arrow_strings = False,
+                 columns = None):
     """
     Creates a dataframe that contains all data from our database.
 
+    The cleaned dataframe is cached in Parquet format next to the dataset. The cache
+    is keyed by a fingerprint of the csv contents and of the cleaning code, so later
+    calls load the cleaned frame directly and only re-parse/re-clean the csv when
+    either of them changes.
+
     parameter:
         file_name - str
             The raw filename from 'Dataset/' directory
 
+        use_cache - bool
+            Whether to read/write the cleaned dataframe cache.
+
+        cache_dir - str
+            Directory the cache files are written to. Defaults to 'Dataset/.cache'.
+
+        compact - bool
+            Whether to apply the compact dtype schema (see Apply_compact_schema()).
+            The float columns are already read as float32 from the csv.
+
+        arrow_strings - bool
+            When compact, also store the remaining text columns as Arrow-backed
+            strings (requires pyarrow).
+
+        columns - list
+            Names of the (cleaned) columns to load. Only these columns, and the ones
+            their cleaning depends on, are parsed from the csv, and the cleaning rules
+            of the other columns are skipped. All columns are loaded when not given.
+
     Returns:
         df - pd.DataFrame
             Data frame that we can now use for analysis.
     """
     assert isinstance(file_name, str), "database filename must be a string."
+    assert isinstance(use_cache, bool), "use_cache must be a bool."
+    assert cache_dir is None or isinstance(cache_dir, str), "cache_dir must be a string."
+    assert isinstance(compact, bool) and isinstance(arrow_strings, bool), "compact and arrow_strings must be bools."
+    assert columns is None or (isinstance(columns, list) and len(columns) > 0), "columns must be a non empty list."
+    assert columns is None or all(isinstance(name, str) for name in columns), "Column names must be strings."
+
+    file_path = Get_dataset_file_path(file_name)
+    # usecols also accepts a callable, so raw columns missing from the csv are not an error
+    read_columns = lambda name: name not in UNUSED_COLUMNS
+    if columns is not None:
+        columns = list(dict.fromkeys(columns))
+        required_columns = set()
+        # the dependencies of a dependency are needed too (e.g. an interval's dates)
+        pending_columns = list(columns)
+        while pending_columns:
+            name = pending_columns.pop()
+            if name not in required_columns:
+                required_columns.add(name)
+                pending_columns.extend(CLEANING_DEPENDENCIES.get(name, []))
+        read_columns = required_columns.__contains__
+
+    cache_path = None
+    if use_cache:
+        variant = ('compact-arrow' if arrow_strings else 'compact') if compact else ''
+        if columns is not None:
+            variant = '-'.join(filter(None, [variant, 'columns', Cache.Get_cache_key(columns)[:8]]))
+        cache_path = Get_cache_path(file_path, cache_dir, variant)
+        df = Cache.Load_cached_df(cache_path)
+        if df is not None:
+            return df
+
+    if compact:
+        df = pd.read_csv(file_path, usecols=read_columns, dtype=dict.fromkeys(COMPACT_FLOAT_COLUMNS, 'float32'))
+        df = Apply_compact_schema(Clean_raw_data(df), arrow_strings)
+    else:
+        df = Clean_raw_data(pd.read_csv(file_path, usecols=read_columns))
+    if columns is not None:
+        missing_columns = set(columns) - set(df.columns)
+        assert not missing_columns, f"Columns {missing_columns} do not exist in the cleaned data."
+        df = df[columns]
+
+    if use_cache:
+        if Cache.Save_cached_df(df, cache_path):
+            Remove_stale_caches(cache_path)
+    return df
+
+def Get_dataset_file_path(file_name):
+    """
+    Returns the absolute path of 'file_name' inside the 'Dataset/' directory. The path
+    is resolved from the location of this project, so the working directory is
+    neither used nor changed.
+
+    parameter:
+        file_name - str
+            The raw filename from 'Dataset/' directory (or an absolute path).
+
+    Returns:
+        file_path - str
+            Absolute path of the file.
+    """
+    assert isinstance(file_name, str), "database filename must be a string."
+    return Dir.Get_dataset_file_path(file_name)
+
+def Get_dataset_catalog(pattern = '*.csv'):
+    """
+    Lists the files of the 'Dataset/' directory matching 'pattern', e.g. every yearly
+    or regional wildfire csv.
+
+    parameter:
+        pattern - str
+            Glob pattern of the file names.
+
+    Returns:
+        file_names - list
+            Sorted file names, ready to be passed to Get_catalog_data().
+    """
+    assert isinstance(pattern, str), "pattern must be a string."
+    file_paths = glob.glob(os.path.join(Dir.Get_dataset_directory(), pattern))
+    return sorted(os.path.basename(file_path) for file_path in file_paths)
+
+def Get_catalog_data(file_names, max_workers = None, use_cache = True, compact = False):
+    """
+    Loads and cleans several database files (e.g. the yearly or regional csvs of the
+    wildfire history) in parallel across a process pool and concatenates them into
+    one dataframe. Columns missing from some files are filled with NaN.
+
+    parameters:
+        file_names - list
+            Raw filenames from 'Dataset/' directory (see Get_dataset_catalog()).
+
+        max_workers - int
+            Number of worker processes. Defaults to the number of CPUs.
+
+        use_cache - bool
+            Whether every file is read from/written to the Get_all_data() cache.
+
+        compact - bool
+            Whether to apply the compact dtype schema (see Apply_compact_schema()).
+
+    Returns:
+        df - pd.DataFrame
+            The cleaned data of all files, in the order of 'file_names'.
+    """
+    assert isinstance(file_names, (list, tuple)) and len(file_names) > 0, "file_names must be a non empty list."
+    assert all(isinstance(name, str) for name in file_names), "database filenames must be strings."
+    assert max_workers is None or (isinstance(max_workers, int) and max_workers > 0), "max_workers must be an integer and > zero."
+
+    load_file = functools.partial(Get_all_data, use_cache=use_cache, compact=compact)
+    if len(file_names) == 1 or max_workers == 1:
+        frames = [load_file(file_name) for file_name in file_names]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            frames = list(executor.map(load_file, file_names))
+
+    df = pd.concat(frames, ignore_index=True, sort=False)
+    if compact:
+        # categoricals with different categories are concatenated as plain objects
+        df = Apply_compact_schema(df)
+    return df
+
+def Get_all_data_in_chunks(file_name, chunk_size = 100000):
+    """
+    Streams the database in chunks of 'chunk_size' rows, cleaning each chunk with the
+    same rules as Get_all_data(). Peak memory is bounded by the chunk size instead of
+    the size of the whole dataset.
+
+    parameters:
+        file_name - str
+            The raw filename from 'Dataset/' directory
+
+        chunk_size - int
+            Number of csv rows read and cleaned at a time.
+
+    Yields:
+        chunk - pd.DataFrame
+            A cleaned chunk of the data. Chunks keep the row labels of the csv.
+    """
+    assert isinstance(file_name, str), "database filename must be a string."
+    assert isinstance(chunk_size, int) and chunk_size > 0, "chunk_size must be an integer and > zero."
+
+    file_path = Get_dataset_file_path(file_name)
+    # Text columns are read as strings so a chunk where a column happens to be
+    # empty has the same dtype as every other chunk.
+    text_dtypes = dict.fromkeys(RAW_TEXT_COLUMNS + RAW_DATE_COLUMNS, str)
+    with pd.read_csv(file_path, chunksize=chunk_size, dtype=text_dtypes) as reader:
+        for chunk in reader:
+            yield Clean_raw_data(chunk)
+
+def Write_all_data_in_chunks(file_name, output_path, chunk_size = 100000):
+    """
+    Cleans the database chunk by chunk (see Get_all_data_in_chunks()) and appends
+    every cleaned chunk to 'output_path' as soon as it is ready, so the full cleaned
+    dataset never has to fit in memory.
 
-    #this section automatically pulls the data from 'file_name' that is stored in 'Dataset/' and returns to the
-    original_dir = Dir.Get_current_directory()
-    target_dir = 'ECE-143-Wildfire-Project\\Dataset'
-    Dir.To_directory(target_dir)
-    #target_dir = 'Dataset'
-    #Dir.To_directory(target_dir)
-    df = pd.read_csv(file_name)
-    Dir.To_directory(original_dir)
-
-    df = df.drop( columns= ['fire_year', 'permit_detail_desc'] )
-    dateColumns = [ 'assessment_datetime', 'fire_start_date','discovered_date', 
-                   'reported_date', 'start_for_fire_date', 'fire_fighting_start_date',
-                    'bh_fs_date', 'uc_fs_date', 'ex_fs_date', 'to_fs_date' ]
-    df[dateColumns] = df[dateColumns].apply( pd.to_datetime )
-
-    # Filling out the nan values
-    df['fire_start_date'].fillna( df['start_for_fire_date'], inplace= True )
-    df['det_agent_type'].fillna("Unknown", inplace= True)
-    df['det_agent'].fillna("Unknow", inplace= True)
-    df['fire_fighting_start_size'].fillna(0, inplace= True)
+    parameters:
+        file_name - str
+            The raw filename from 'Dataset/' directory
+
+        output_path - str
+            File the cleaned data is written to. Must end in '.parquet' (requires
+            pyarrow) or '.csv'.
+
+        chunk_size - int
+            Number of csv rows read and cleaned at a time.
+
+    Returns:
+        total_rows - int
+            Number of cleaned rows written to 'output_path'.
+    """
+    assert isinstance(output_path, str), "output_path must be a string."
+    assert output_path.endswith(('.parquet', '.csv')), "output_path must be a .parquet or .csv file."
+
+    total_rows = 0
+    if output_path.endswith('.csv'):
+        for chunk in Get_all_data_in_chunks(file_name, chunk_size):
+            chunk.to_csv(output_path, mode='w' if total_rows == 0 else 'a',
+                         header=(total_rows == 0), index=False)
+            total_rows += len(chunk)
+        return total_rows
+
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    writer = None
+    try:
+        for chunk in Get_all_data_in_chunks(file_name, chunk_size):
+            if writer is None:
+                schema = pa.Schema.from_pandas(chunk, preserve_index=False)
+                # a column that is empty in the first chunk would be typed as null
+                for index, field in enumerate(schema):
+                    if pa.types.is_null(field.type):
+                        schema = schema.set(index, field.with_type(pa.string()))
+                writer = pq.ParquetWriter(output_path, schema)
+            writer.write_table(pa.Table.from_pandas(chunk, schema=writer.schema, preserve_index=False))
+            total_rows += len(chunk)
+    finally:
+        if writer is not None:
+            writer.close()
+    return total_rows
+
+def Get_cache_path(file_path, cache_dir = None, variant = ''):
+    """
+    Returns the path of the cleaned dataframe cache for the csv at 'file_path'. The
+    file name holds a key made from the csv contents, the cleaning code and
+    CLEANING_VERSION, so any change to one of them points to a new cache file.
+
+    Parameters:
+        file_path - str
+            Absolute path of the raw csv.
+
+        cache_dir - str
+            Directory of the cache files. Defaults to '.cache' next to the csv.
+
+        variant - str
+            Name of the loading options that change the cleaned frame (e.g. 'compact'),
+            so each variant of the same csv keeps its own cache file.
+
+    Returns:
+        cache_path - str
+            Path of the Parquet cache file.
+    """
+    assert isinstance(file_path, str), "file_path must be a string."
+    if cache_dir is None:
+        cache_dir = os.path.join(os.path.dirname(file_path), CACHE_DIRECTORY_NAME)
+
+    cleaning_functions = [stage['function'] for stage in CLEANING_STAGES]
+    key = Cache.Get_cache_key(Cache.Get_file_fingerprint(file_path),
+                              Cache.Get_source_fingerprint(Clean_raw_data, *cleaning_functions),
+                              [(stage['name'], stage['version']) for stage in CLEANING_STAGES],
+                              Cache.Get_source_fingerprint(Parse_date_columns, Apply_compact_schema),
+                              CLEANING_RULE_TABLES, CLEANING_VERSION, pd.__version__, variant)
+    file_stem = os.path.splitext(os.path.basename(file_path))[0]
+    if variant:
+        file_stem = f"{file_stem}.{variant}"
+    return os.path.join(cache_dir, f"{file_stem}-{key}.parquet")
+
+def Remove_stale_caches(current_cache_path):
+    """
+    Deletes older cache files of the same csv (and variant) so the cache directory
+    does not keep growing every time the data or the cleaning code changes.
+    """
+    cache_dir, cache_name = os.path.split(current_cache_path)
+    file_stem = cache_name[:cache_name.rindex('-')]
+    cache_file_pattern = re.compile(rf"{re.escape(file_stem)}-[0-9a-f]{{16}}\.parquet")
+    for cache_file in os.listdir(cache_dir):
+        cache_file_path = os.path.join(cache_dir, cache_file)
+        if cache_file_pattern.fullmatch(cache_file) and cache_file_path != current_cache_path:
+            os.remove(cache_file_path)
+
+def Clean_raw_data(df):
+    """
+    Applies all of our cleaning rules (the CLEANING_STAGES, in order) to the
+    dataframe read from the raw csv. Rules whose columns were not read (see
+    'columns' of Get_all_data()) are skipped. The columns are cleaned in place,
+    without copying the whole frame.
+
+    Parameter:
+        df - pd.DataFrame
+            Dataframe exactly as read from the csv in 'Dataset/'. It is modified.
+
+    Returns:
+        df - pd.DataFrame
+            The cleaned dataframe.
+    """
+    assert isinstance(df, pd.DataFrame), "Input must be a pandas dataframe."
+
+    for stage in CLEANING_STAGES:
+        df = stage['function'](df)
+    return df
+
+def Run_cleaning_pipeline(file_name, cache_dir = None, printing = True):
+    """
+    Cleans the database like Get_all_data(), stage by stage (see CLEANING_STAGES),
+    and reports the wall time and memory change of every stage. The output of every
+    stage is cached under a key made from its input and its version/code, so after
+    a cleaning rule is edited only that stage and the ones after it are rerun.
+
+    parameters:
+        file_name - str
+            The raw filename from 'Dataset/' directory
+
+        cache_dir - str
+            Directory the stage outputs are cached in. Defaults to 'Dataset/.cache'.
+
+        printing - bool
+            Decides whether the per-stage timing report is printed.
+
+    Returns:
+        df - pd.DataFrame
+            The cleaned dataframe.
+
+        report - pd.DataFrame
+            Per-stage timings, see Pipeline_utils.Run_pipeline().
+    """
+    assert isinstance(file_name, str), "database filename must be a string."
+    assert isinstance(printing, bool), "printing must be a bool."
+
+    file_path = Get_dataset_file_path(file_name)
+    if cache_dir is None:
+        cache_dir = os.path.join(os.path.dirname(file_path), CACHE_DIRECTORY_NAME)
+
+    input_key = Cache.Get_cache_key(Cache.Get_file_fingerprint(file_path), pd.__version__)
+    stages = [{'name': 'read_csv', 'version': 1, 'function': lambda _: pd.read_csv(file_path)}] + CLEANING_STAGES
+    # reading the csv is a stage too, so its time is reported and a cached stage skips it
+    df, report = Pipe.Run_pipeline(pd.DataFrame(), stages, input_key, cache_dir,
+                                   cache_name=os.path.splitext(os.path.basename(file_path))[0])
+    if printing:
+        Pipe.Print_pipeline_report(report)
+    return df, report
+
+def Measure_peak_memory(function, *args):
+    """
+    Runs function(*args) and returns its result with the peak memory (in bytes)
+    allocated while it ran, as traced by tracemalloc (numpy and pandas buffers included).
+    """
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        start_memory = tracemalloc.get_traced_memory()[0]
+        result = function(*args)
+        peak_memory = tracemalloc.get_traced_memory()[1] - start_memory
+    finally:
+        tracemalloc.stop()
+    return result, peak_memory
+
+def Compare_cleaning_peak_memory(file_name):
+    """
+    Measures the peak memory of Clean_raw_data() against the cleaning as it was
+    written before (every rule returning or assigning a new copy, one fillna per
+    column and .loc writes for the fuel types and the lifecycle intervals) on the
+    same raw csv, checks that both give the same frame and prints both peaks.
+
+    parameters:
+        file_name - str
+            The raw filename from 'Dataset/' directory
+
+    Returns:
+        peaks - dict
+            Peak memory in MB above the raw frame, keyed 'copying' and 'clean_raw_data'.
+    """
+    assert isinstance(file_name, str), "database filename must be a string."
+
+    def copying_clean(df):
+        df = df.drop( columns= UNUSED_COLUMNS )
+        df = Convert_date_columns(df)
+        df['fire_start_date'] = df['fire_start_date'].fillna( df['start_for_fire_date'] )
+        for name, value in FILL_VALUES.items():
+            df[name] = df[name].fillna( value )
+        df = df.drop(columns= ['start_for_fire_date'])
+        df = Map_fuel_types(df)
+        df['fire_type'] = df['fire_type'].str.strip()
+        df['fire_type'] = df['fire_type'].replace( '', 'Unknown' )
+        nullRow = df[ df['fuel_type'].isnull() & df['other_fuel_type'].isnull() ].index
+        df.loc[nullRow, ['fuel_type', 'other_fuel_type']] = "Unknown"
+        nullFuelRow = df[ df['fuel_type'].isnull() & df['other_fuel_type'].notnull() ].index
+        df.loc[nullFuelRow, ['fuel_type']] = "Other Fuel"
+        nullOtherRow = df[ df['fuel_type'].notnull() & df['other_fuel_type'].isnull() ].index
+        df.loc[nullOtherRow, ['other_fuel_type']] = "Known Fuel"
+        for name, (start_column, end_column) in LIFECYCLE_INTERVALS.items():
+            df[name] = df[end_column] - df[start_column]
+            df.loc[df[name] < pd.Timedelta(0), name] = pd.NaT
+        return df
+
+    raw_df = pd.read_csv(Get_dataset_file_path(file_name))
+    # both run on their own copy of the raw frame, made before the tracing starts
+    expected, copying_peak = Measure_peak_memory(copying_clean, raw_df.copy())
+    cleaned, cleaning_peak = Measure_peak_memory(Clean_raw_data, raw_df.copy())
+    assert expected.equals(cleaned), "Clean_raw_data() does not match the copying cleaning."
+
+    peaks = {'copying': copying_peak / 2**20, 'clean_raw_data': cleaning_peak / 2**20}
+    print(f"Peak memory of cleaning {len(raw_df)} rows (raw frame: "
+          f"{raw_df.memory_usage(deep=True).sum() / 2**20:.1f} MB):")
+    print(f"\tcopying cleaning: {peaks['copying']:.1f} MB")
+    print(f"\tClean_raw_data:   {peaks['clean_raw_data']:.1f} MB "
+          f"(reduction: {1 - peaks['clean_raw_data'] / peaks['copying']:.0%})")
+    return peaks
+
+def Drop_unused_columns(df):
+    """
+    Drops the fire_year column (it can be the fiscal or calendar year) and the
+    permit_detail_desc column (entirely null).
+    """
+    # deleting the columns in place avoids the full copy of the frame that drop() makes
+    for name in UNUSED_COLUMNS:
+        if name in df.columns:
+            del df[name]
+    return df
+
+def Convert_date_columns(df):
+    """
+    Converts the date columns from strings to datetimes (see Parse_date_columns()).
+    """
+    dateColumns = [name for name in RAW_DATE_COLUMNS if name in df.columns]
+    return Parse_date_columns(df, dateColumns)
+
+def Fill_missing_values(df):
+    """
+    Fills the nans of the columns with the defaults of FILL_VALUES, and of
+    fire_start_date with start_for_fire_date (which is then dropped as redundant).
+    """
+    # Dropping this column as it seems to be redundant from the dataset dictionary,
+    # its values are only used to fill the missing start dates
+    if 'start_for_fire_date' in df.columns:
+        start_for_fire_date = df.pop('start_for_fire_date')
+        if 'fire_start_date' in df.columns:
+            df['fire_start_date'] = df['fire_start_date'].fillna( start_for_fire_date )
+
+    # Filling out the nan values of all columns with one fillna on the frame itself
+    # (filling a selected column in place may only fill a copy of it)
     #df['true_cause'].fillna( -1, inplace= True )
-    df['fire_position_on_slope'].fillna( "Unknown", inplace= True )
-    df['initial_action_by'].fillna( "Unknown", inplace= True )
-    df['industry_identifier_desc'].fillna("Non Industrial / Other Industry")
-    df['responsible_group_desc'].fillna( "Unknown", inplace= True )
-    df['activity_class'].fillna("Unknown", inplace= True)
-    df['weather_conditions_over_fire'].fillna( "Unknown", inplace= True )
-    df['general_cause_desc'].fillna("Restart", inplace= True )
-
-    # Dropping this column as it seems to be redundant from the dataset dictionary
-    df = df.drop(columns= ['start_for_fire_date'])
-
-    # Coding the general cause according to the data dictionary
-    genCauseMap = { "Other Industry":0, "Lightning":1, "Resident":2, 
-                "Forest Industry":3, "Railroad":4, "Prescribed Fire":5, 
-                "Recreation":6, "Incendiary":7, "Miscellaneous Known":8,
-                "Power Line Industry":9, "Oil & Gas Industry":10, "Restart":11,
-                "Undetermined":12}
+    fill_values = {name: value for name, value in FILL_VALUES.items() if name in df.columns}
+    if fill_values:
+        df.fillna( fill_values, inplace= True )
+    return df
+
+def Map_fuel_types(df):
+    """
+    Replaces the fuel type codes with their names (see fuelTypeMap).
+    """
+    # Coding the general cause according to the data dictionary (see genCauseMap)
     #this line is commented out because I couldnt find a reason where i would want numbers instead of names sry
     #df["general_cause_desc"] = df["general_cause_desc"].map( genCauseMap )
 
-    fuelTypeMap = { "C1": "spruce-lichen woodland",'C2': 'boreal spruce', 'C3': 'mature Jack or Lodgepole Pine','C4': 'immature Jack or Lodgepole Pine',
-                'C5': 'Red and White Pine', 'C6': 'conifer plantation Deciduous', 'D1': 'leafless Aspen Mixedwood', 'M1': 'boreal mixedwood - leafless',
-                'M2': 'boreal mixedwood - green', 'M3': 'dead Balsam fir mixedwood - leafless', 'M4': 'dead Balsam fir mixedwood-green Slash',
-                'S1': 'Jack or Lodgepole Pine slash', 'S2': 'White Spruce - Balsam slash Grass', 'O1a': 'matted grass', 'O1b': 'standing grass'}
-    df["fuel_type"] = df["fuel_type"].map(fuelTypeMap)
-
-    # Coding true cause
-    trueCauseMap = { 'Abandoned Fire':1, 'Burning Substance':7, 'Unsafe Fire':2, 
-                    'Arson Suspected':12, 'Insufficient Buffer':5, 'Hot Exhaust':8, 
-                    'Unpredictable Event':9, 'Unattended Fire':4, 'Arson Known':10, 
-                    'High Hazard':11, 'Insufficient Resources':3, 'Flammable Fluids':6, 
-                    'Permit Related':0}  
+    if 'fuel_type' in df.columns:
+        df["fuel_type"] = df["fuel_type"].map(fuelTypeMap)
+
+    # Coding true cause (see trueCauseMap)
     #df['true_cause'] = df['true_cause'].map(trueCauseMap)
-    df['fire_type'] = df['fire_type'].str.strip()
-    df['fire_type'].replace( '', 'Unknown', inplace= True )
-
-    # Replacing nans in fuel_type and other_fuel_type with appropriate values.
-    nullRow = df[ df['fuel_type'].isnull() & df['other_fuel_type'].isnull() ].index
-    df.loc[nullRow, ['fuel_type', 'other_fuel_type']] = "Unknown"
-    nullFuelRow = df[ df['fuel_type'].isnull() & df['other_fuel_type'].notnull() ].index
-    df.loc[nullFuelRow, ['fuel_type']] = "Other Fuel"
-    nullOtherRow = df[ df['fuel_type'].notnull() & df['other_fuel_type'].isnull() ].index
-    df.loc[nullOtherRow, ['other_fuel_type']] = "Known Fuel"
-    
     return df
 
+def Clean_fire_types(df):
+    """
+    Strips the fire_type values and marks the empty ones as 'Unknown'.
+    """
+    if 'fire_type' in df.columns:
+        fire_types = df['fire_type'].str.strip()
+        df['fire_type'] = fire_types.mask( fire_types == '', 'Unknown' )
+    return df
+
+def Fill_missing_fuel_types(df):
+    """
+    Replaces the nans of fuel_type and other_fuel_type: 'Unknown' when both are
+    missing, 'Other Fuel' when only fuel_type is and 'Known Fuel' when only
+    other_fuel_type is.
+    """
+    # Replacing nans in fuel_type and other_fuel_type with appropriate values. Both
+    # null masks are computed once and all three cases are resolved from them.
+    if 'fuel_type' in df.columns and 'other_fuel_type' in df.columns:
+        fuel_missing = df['fuel_type'].isna().to_numpy()
+        other_fuel_missing = df['other_fuel_type'].isna().to_numpy()
+        if fuel_missing.any():
+            df['fuel_type'] = df['fuel_type'].mask( fuel_missing, np.where(other_fuel_missing, "Unknown", "Other Fuel") )
+        if other_fuel_missing.any():
+            df['other_fuel_type'] = df['other_fuel_type'].mask( other_fuel_missing, np.where(fuel_missing, "Unknown", "Known Fuel") )
+    return df
+
+def Add_lifecycle_intervals(df):
+    """
+    Adds the LIFECYCLE_INTERVALS of every fire as timedelta columns, each computed by
+    one vectorized subtraction of two date columns. An interval is missing when one of
+    its dates is, or when the dates were recorded out of order (negative interval).
+    """
+    for name, (start_column, end_column) in LIFECYCLE_INTERVALS.items():
+        if start_column in df.columns and end_column in df.columns:
+            interval = df[end_column] - df[start_column]
+            df[name] = interval.mask( interval < pd.Timedelta(0) )
+    return df
+
+# The cleaning rules, in the order they are applied, with the rule tables each one
+# reads. Bump a stage's version to force it (and every stage after it) to be
+# recomputed by Run_cleaning_pipeline().
+CLEANING_STAGES = [
+    {'name': 'drop_unused_columns', 'version': 1, 'function': Drop_unused_columns,
+     'rules': [UNUSED_COLUMNS]},
+    {'name': 'convert_date_columns', 'version': 1, 'function': Convert_date_columns,
+     'rules': [RAW_DATE_COLUMNS, DATE_FORMATS]},
+    {'name': 'fill_missing_values', 'version': 1, 'function': Fill_missing_values,
+     'rules': [FILL_VALUES]},
+    {'name': 'map_fuel_types', 'version': 1, 'function': Map_fuel_types,
+     'rules': [fuelTypeMap]},
+    {'name': 'clean_fire_types', 'version': 1, 'function': Clean_fire_types},
+    {'name': 'fill_missing_fuel_types', 'version': 1, 'function': Fill_missing_fuel_types},
+    {'name': 'add_lifecycle_intervals', 'version': 1, 'function': Add_lifecycle_intervals,
+     'rules': [LIFECYCLE_INTERVALS]},
+]
+
+def Detect_date_format(values, sample_size = 1000):
+    """
+    Detects the timestamp format of the given date strings by trying every format in
+    DATE_FORMATS on a sample of them.
+
+    Parameters:
+        values - array-like of str
+            Date strings, missing values are ignored.
+
+        sample_size - int
+            Number of (non missing) values the formats are tried on.
+
+    Returns:
+        date_format - str or None
+            The format that parses the most of the sample, or None when no format
+            parses any of it (pandas will then infer the format itself).
+    """
+    assert isinstance(sample_size, int) and sample_size > 0, "sample_size must be an integer and > zero."
+
+    sample = pd.Series(values, dtype=object).dropna()
+    sample = sample[:sample_size].astype(str)
+    if sample.empty:
+        return None
+
+    best_format, best_count = None, 0
+    for date_format in DATE_FORMATS:
+        parsed_count = pd.to_datetime(sample, format=date_format, errors='coerce').notna().sum()
+        if parsed_count > best_count:
+            best_format, best_count = date_format, parsed_count
+        if best_count == len(sample):
+            break
+    return best_format
+
+def Parse_date_columns(df, date_columns, date_format = None):
+    """
+    Converts the date string columns of 'df' to datetimes. The format is detected
+    once for all columns. Unless it is an ISO 8601 format (which pandas parses
+    directly), every distinct timestamp string is parsed only once, no matter how
+    many rows or columns it appears in. Values that do not match the format (or
+    cannot be parsed at all) become NaT.
+
+    Parameters:
+        df - pd.DataFrame
+            Dataframe holding the date columns. The columns are converted in place.
+
+        date_columns - list
+            Names of the columns to convert. Columns that already hold datetimes
+            are left as they are.
+
+        date_format - str
+            strftime format of the timestamps. Detected with Detect_date_format()
+            when not given.
+
+    Returns:
+        df - pd.DataFrame
+            The dataframe with the converted columns.
+    """
+    assert isinstance(df, pd.DataFrame), "Input must be a pandas dataframe."
+    assert isinstance(date_columns, list), "date_columns must be entered in as a list."
+    assert all(name in df.columns for name in date_columns), \
+    f"Date columns missing from the DataFrame: {set(date_columns) - set(df.columns)}."
+    assert date_format is None or isinstance(date_format, str), "date_format must be a string."
+
+    string_columns = [name for name in date_columns if not pd.api.types.is_datetime64_any_dtype(df[name])]
+    if not string_columns:
+        return df
+
+    if date_format is None:
+        sample_values = pd.concat([df[name].dropna()[:100] for name in string_columns])
+        date_format = Detect_date_format(sample_values.to_numpy(dtype=object))
+
+    # pandas has a C fast path for ISO 8601 timestamps that parses them about as fast
+    # as they can be hashed, so de-duplicating them first would not pay off. The
+    # format is given as 'ISO8601' so dates with and without a time are both parsed
+    # (pandas >= 2 would otherwise infer a single format from the first value and
+    # turn the values of the other kind into NaT).
+    if date_format is not None and date_format.startswith('%Y-%m-%d'):
+        iso_format = 'ISO8601' if int(pd.__version__.split('.')[0]) >= 2 else None
+        for name in string_columns:
+            df[name] = pd.to_datetime(df[name], format=iso_format, errors='coerce')
+        return df
+
+    # Factorize every column, then the (much shorter) list of their distinct strings,
+    # so each distinct timestamp string is parsed once across all of the columns.
+    column_codes, column_uniques = [], []
+    for name in string_columns:
+        codes, unique_values = pd.factorize(df[name])
+        column_codes.append(codes)
+        column_uniques.append(np.asarray(unique_values, dtype=object))
+    unique_codes, unique_values = pd.factorize(np.concatenate(column_uniques))
+    unique_values = pd.Index(unique_values, dtype=object).astype(str)
+    parsed_values = pd.DatetimeIndex(pd.to_datetime(unique_values, format=date_format, errors='coerce'))
+
+    offset = 0
+    for name, codes, uniques in zip(string_columns, column_codes, column_uniques):
+        # position in parsed_values of each of this column's distinct strings
+        value_positions = unique_codes[offset:offset + len(uniques)]
+        offset += len(uniques)
+        positions = np.where(codes >= 0, value_positions[codes], -1) if len(uniques) else codes
+        df[name] = parsed_values.take(positions, allow_fill=True, fill_value=pd.NaT).to_numpy()
+    return df
+
+def Benchmark_date_parsing(file_name, repeats = 3):
+    """
+    Times Parse_date_columns() against converting every date column separately with
+    pd.to_datetime (how Get_all_data() used to do it) on the raw csv and prints the
+    best time of each.
+
+    parameters:
+        file_name - str
+            The raw filename from 'Dataset/' directory
+
+        repeats - int
+            Number of times each method is timed.
+
+    Returns:
+        timings - dict
+            Best time in seconds of each method, keyed 'per_column' and 'parse_date_columns'.
+    """
+    assert isinstance(repeats, int) and repeats > 0, "repeats must be an integer and > zero."
+
+    raw_df = pd.read_csv(Get_dataset_file_path(file_name), usecols=RAW_DATE_COLUMNS,
+                         dtype=dict.fromkeys(RAW_DATE_COLUMNS, str))
+    timings = {'per_column': [], 'parse_date_columns': []}
+    for _ in range(repeats):
+        start = time.perf_counter()
+        expected = raw_df.apply(pd.to_datetime)
+        timings['per_column'].append(time.perf_counter() - start)
+
+        parsed = raw_df.copy()
+        start = time.perf_counter()
+        parsed = Parse_date_columns(parsed, RAW_DATE_COLUMNS)
+        timings['parse_date_columns'].append(time.perf_counter() - start)
+
+    assert expected.equals(parsed), "Parse_date_columns() does not match pd.to_datetime."
+    timings = {method: min(times) for method, times in timings.items()}
+    print(f"Date parsing of {len(raw_df)} rows x {len(RAW_DATE_COLUMNS)} columns:")
+    print(f"\tper column pd.to_datetime: {timings['per_column']:.3f} s")
+    print(f"\tParse_date_columns:        {timings['parse_date_columns']:.3f} s "
+          f"(speed-up: {timings['per_column'] / timings['parse_date_columns']:.1f}x)")
+    return timings
+
+def Apply_compact_schema(df, arrow_strings = False, printing = False):
+    """
+    Returns a copy of the cleaned dataframe with a compact dtype schema:
+    the COMPACT_CATEGORY_COLUMNS become categoricals (built from our code maps),
+    the COMPACT_FLOAT_COLUMNS become float32 and calendar_year the smallest
+    integer type that holds it.
+
+    parameters:
+        df - pd.DataFrame
+            The cleaned dataframe (see Get_all_data()).
+
+        arrow_strings - bool
+            Whether the remaining text columns (e.g. fire_number, fire_name) should
+            be stored as Arrow-backed strings. Requires pyarrow.
+
+        printing - bool
+            Decides whether the memory saved by the schema is printed.
+
+    Returns:
+        compact_df - pd.DataFrame
+            The dataframe with the compact schema.
+    """
+    assert isinstance(df, pd.DataFrame), "Input must be a pandas dataframe."
+    assert isinstance(arrow_strings, bool), "arrow_strings must be a bool."
+    assert isinstance(printing, bool), "printing must be a bool."
+
+    compact_df = df.copy(deep=False)
+    for name, known_categories in COMPACT_CATEGORY_COLUMNS.items():
+        if name not in compact_df.columns:
+            continue
+        column = compact_df[name]
+        if isinstance(column.dtype, pd.CategoricalDtype):
+            column = column.astype(object)
+        found = pd.unique(column.dropna())
+        extra_categories = sorted(set(found) - set(known_categories))
+        category_type = pd.CategoricalDtype(list(known_categories) + extra_categories)
+        compact_df[name] = column.astype(category_type)
+
+    for name in COMPACT_FLOAT_COLUMNS:
+        if name in compact_df.columns:
+            compact_df[name] = compact_df[name].astype('float32')
+    if 'calendar_year' in compact_df.columns and compact_df['calendar_year'].notna().all():
+        compact_df['calendar_year'] = pd.to_numeric(compact_df['calendar_year'], downcast='integer')
+
+    if arrow_strings:
+        for name in compact_df.columns:
+            if compact_df[name].dtype == object or pd.api.types.is_string_dtype(compact_df[name].dtype):
+                compact_df[name] = compact_df[name].astype('string[pyarrow]')
+
+    if printing:
+        Print_memory_savings(df, compact_df)
+    return compact_df
+
+def Print_memory_savings(original_df, compact_df):
+    """
+    Prints the memory used by two versions of the same dataframe and how much was
+    saved between them.
+
+    Returns:
+        saved_bytes - int
+            Bytes saved by compact_df compared to original_df.
+    """
+    assert isinstance(original_df, pd.DataFrame) and isinstance(compact_df, pd.DataFrame), "Inputs must be pandas dataframes."
+    original_bytes = original_df.memory_usage(deep=True).sum()
+    compact_bytes = compact_df.memory_usage(deep=True).sum()
+    saved_bytes = int(original_bytes - compact_bytes)
+    percent_saved = 100 * saved_bytes / original_bytes if original_bytes else 0
+    print(f"Memory usage: {original_bytes / 2**20:.2f} MB -> {compact_bytes / 2**20:.2f} MB "
+          f"(saved {saved_bytes / 2**20:.2f} MB, {percent_saved:.1f}%)")
+    return saved_bytes
+
 def Get_all_df_columns(df, printing = False):
     """
     Returns a list of all columns within the dataframe.
@@ -173,6 +932,7 @@ def Checking_column_data(df, stopping_point = 3):
     """
     currently using this to check if certain columns are mainly empty or not
     from an initial glance. Used for quick testing of the first the data set entries.
+    For statistics over the whole data set, use Profile_column_data().
 
     Parameters:
         df - pd.DataFrame
@@ -197,6 +957,80 @@ def Checking_column_data(df, stopping_point = 3):
             else:
                 break
 
+# Profiles computed by Profile_column_data(), keyed by the fingerprint of the data
+_column_profiles = {}
+
+def Profile_column_data(df, top_k = 3, max_workers = None, cache_dir = None, printing = False):
+    """
+    Computes data-quality statistics for every column, to see at a glance which
+    columns are mostly empty, constant, etc. The null fractions and memory use are
+    computed for all columns in one vectorized pass, the per-column statistics
+    (distinct count, min/max and the top values, all from one value count) are
+    computed in parallel across the columns. The profile is cached per version of
+    the data, so profiling the same data again is free.
+
+    Parameters:
+        df - pd.DataFrame
+            Data frame inputted.
+
+        top_k - int
+            Number of most frequent values reported for each column.
+
+        max_workers - int
+            Number of threads the columns are profiled with. Defaults to the
+            number of CPUs.
+
+        cache_dir - str
+            Directory the profile is also persisted to (pickle).
+
+        printing - bool
+            Decides whether the profile is printed as well.
+
+    Returns:
+        profile - pd.DataFrame
+            One row per column with its 'dtype', 'null_fraction', 'distinct_count',
+            'min', 'max', 'top_values' (list of (value, count)) and 'memory_bytes'.
+    """
+    assert isinstance(df, pd.DataFrame), "Input must be a pandas dataframe."
+    assert all(isinstance(name, str) for name in df.columns), "Dataframe column names must be of type str."
+    assert isinstance(top_k, int) and top_k > 0, "top_k must be an integer and > zero."
+    assert max_workers is None or (isinstance(max_workers, int) and max_workers > 0), "max_workers must be an integer and > zero."
+    assert cache_dir is None or isinstance(cache_dir, str), "cache_dir must be a string."
+
+    fingerprint = Cache.Get_cache_key(Cache.Get_df_fingerprint(df), top_k)
+    cache_path = None if cache_dir is None else os.path.join(cache_dir, f"column_profile-{fingerprint}.pkl")
+
+    def build_profile():
+        def profile_column(name):
+            column = df[name]
+            value_counts = column.value_counts(dropna=True)
+            # categoricals also count the categories that never occur (e.g. the unused
+            # fuel types of the compact frame)
+            value_counts = value_counts[value_counts.to_numpy() > 0]
+            minimum = maximum = None
+            if len(value_counts) and (pd.api.types.is_numeric_dtype(column) or pd.api.types.is_datetime64_any_dtype(column)):
+                minimum, maximum = column.min(), column.max()
+            top_values = list(zip(value_counts.index[:top_k].tolist(), value_counts.to_numpy()[:top_k].tolist()))
+            return len(value_counts), minimum, maximum, top_values
+
+        # value_counts releases the GIL for most of its work, so threads run in parallel
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            column_stats = list(executor.map(profile_column, df.columns))
+
+        profile = pd.DataFrame(column_stats, index=pd.Index(df.columns, name='column'),
+                               columns=['distinct_count', 'min', 'max', 'top_values'])
+        profile.insert(0, 'dtype', df.dtypes.astype(str))
+        profile.insert(1, 'null_fraction', df.isna().mean() if len(df) else 0.0)
+        profile['memory_bytes'] = df.memory_usage(deep=True, index=False)
+        return profile
+
+    profile = Cache.Get_latest_version(_column_profiles, fingerprint, build_profile, cache_path)
+    if printing:
+        with pd.option_context('display.max_rows', None, 'display.max_columns', None,
+                               'display.max_colwidth', 60, 'display.width', 250):
+            print(profile)
+    return profile
+
 def Create_df_with(unfiltered_df, column_name_list):
     """
     Allows us to create a dataframe with any columns we wish. The order in which
@@ -226,17 +1060,16 @@ def Create_df_with(unfiltered_df, column_name_list):
     (f"At least one name in {column_name_list} does not exist within the DataFrame columns: "
      f"{set(column_name_list) - set(unfiltered_df.columns)}.")
 
-    new_df = pd.DataFrame()
-    for name in column_name_list:
-        new_df[name] = unfiltered_df[name]
+    # a single projection instead of inserting the columns one at a time; repeated
+    # names are only taken once, as before
+    new_df = unfiltered_df[list(dict.fromkeys(column_name_list))]
 
     return new_df
 
 def Get_valid_fire_names_df(unfiltered_df = None):
     """
-    Extracts the existing fire names from the dataframe. Plans are to use it
-    to create a lookup dataframe for the fire names based on each fire's unique
-    fire ID.
+    Extracts the existing fire names from the dataframe. For looking fires up by
+    their unique fire ID, use Get_fire_lookup_index() instead.
 
     Parameters:
         unfiltered_df pd.DataFrame
@@ -255,7 +1088,197 @@ def Get_valid_fire_names_df(unfiltered_df = None):
     filtered_df = filtered_df[filtered_df['fire_name'].notna() & (unfiltered_df['fire_name'].str.strip() != "")]
     return filtered_df
 
-def Get_only_complete_data(unfiltered_df):
+# Lookup table built by Get_fire_lookup_index(), keyed by the fingerprint of the data
+_fire_lookup_indexes = {}
+LOOKUP_INDEX_COLUMNS = ['fire_number', 'calendar_year', 'fire_name']
+
+def Build_fire_lookup_index(unfiltered_df = None):
+    """
+    Builds the lookup table of the fires by their unique fire ID. Fire numbers are
+    reused across years, so the table is indexed by 'fire_number' and
+    'calendar_year' and holds each fire's name and its row position in
+    'unfiltered_df'. When a (fire_number, calendar_year) pair appears more than
+    once, its first row is kept.
+
+    Parameters:
+        unfiltered_df pd.DataFrame
+            The data frame that contains all original data.
+
+    Returns:
+        lookup_index - dict
+            See Index_fire_lookup_table().
+    """
+    assert unfiltered_df is not None, "Insert a pandas dataframe."
+    assert all(name in unfiltered_df.columns for name in LOOKUP_INDEX_COLUMNS), \
+    f"The dataframe must contain the {LOOKUP_INDEX_COLUMNS} columns."
+
+    fire_names = unfiltered_df['fire_name'].astype(object)
+    fire_names = fire_names.where(fire_names.notna() & (fire_names.astype(str).str.strip() != ""))
+    fire_keys = pd.MultiIndex.from_arrays([unfiltered_df['fire_number'].to_numpy(),
+                                           unfiltered_df['calendar_year'].to_numpy()],
+                                          names=['fire_number', 'calendar_year'])
+    table = pd.DataFrame({'fire_name': fire_names.to_numpy(),
+                          'row_position': np.arange(len(unfiltered_df))}, index=fire_keys)
+    table = table[~table.index.duplicated(keep='first')]
+    return Index_fire_lookup_table(table)
+
+def Index_fire_lookup_table(table):
+    """
+    Adds the hash indexes of the fire numbers to a lookup table, so the fires can be
+    looked up with or without their year in O(1) per fire.
+
+    Parameters:
+        table - pd.DataFrame
+            Columns 'fire_name' and 'row_position', indexed by 'fire_number' and
+            'calendar_year'.
+
+    Returns:
+        lookup_index - dict
+            The 'table', the 'numbers' used in a single year (a unique pd.Index) with
+            the position in the table of each ('number_positions'), and the
+            'reused_numbers' used in more than one year (a unique pd.Index).
+    """
+    numbers = table.index.get_level_values('fire_number')
+    reused = numbers.duplicated(keep=False)
+    single_year_positions = np.flatnonzero(~reused)
+    return {'table': table,
+            'numbers': pd.Index(numbers[single_year_positions], name='fire_number'),
+            'number_positions': single_year_positions,
+            'reused_numbers': pd.Index(numbers[reused].unique(), name='fire_number')}
+
+def Get_fire_lookup_index(unfiltered_df = None, cache_dir = None):
+    """
+    Returns the lookup index of Build_fire_lookup_index(), building it only once per
+    version of the data: the index is kept in memory, and its table also in
+    'cache_dir' when given, under a fingerprint of the 'fire_number',
+    'calendar_year' and 'fire_name' columns.
+
+    Parameters:
+        unfiltered_df pd.DataFrame
+            The data frame that contains all original data.
+
+        cache_dir - str
+            Directory the table is persisted to (Parquet, requires pyarrow).
+
+    Returns:
+        lookup_index - dict
+            See Index_fire_lookup_table().
+    """
+    assert unfiltered_df is not None, "Insert a pandas dataframe."
+    assert cache_dir is None or isinstance(cache_dir, str), "cache_dir must be a string."
+
+    fingerprint = Cache.Get_df_fingerprint(unfiltered_df, LOOKUP_INDEX_COLUMNS)
+    cache_path = None
+    if cache_dir is not None:
+        cache_path = os.path.join(cache_dir, f"fire_lookup_index-{fingerprint[:16]}.parquet")
+
+    # only the table is persisted, its hash indexes are rebuilt when it is loaded
+    def load_lookup_index(cache_path):
+        table = Cache.Load_cached_df(cache_path)
+        if table is None:
+            return None
+        return Index_fire_lookup_table(table.set_index(['fire_number', 'calendar_year']))
+
+    def save_lookup_index(lookup_index, cache_path):
+        Cache.Save_cached_df(lookup_index['table'].reset_index(), cache_path)
+
+    return Cache.Get_latest_version(_fire_lookup_indexes, fingerprint,
+                                    lambda: Build_fire_lookup_index(unfiltered_df), cache_path,
+                                    load_lookup_index, save_lookup_index)
+
+def Get_fire_years(lookup_index, fire_number):
+    """
+    Returns the years a fire number is used in (a scan of the table, only used to
+    report ambiguous numbers).
+    """
+    table = lookup_index['table']
+    return table.index.get_level_values('calendar_year')[
+        table.index.get_level_values('fire_number') == fire_number].tolist()
+
+def Lookup_fire(lookup_index, fire_number, calendar_year = None):
+    """
+    Looks up a single fire in the index of Get_fire_lookup_index() in O(1), with a
+    hash lookup of its (fire_number, calendar_year) or, without a year, of its number.
+
+    Parameters:
+        lookup_index - dict
+            Index returned by Get_fire_lookup_index().
+
+        fire_number - str
+            The fire ID, e.g. 'E01001'.
+
+        calendar_year - int
+            The year of the fire. Only needed when the fire number is used in more
+            than one year.
+
+    Returns:
+        fire - dict or None
+            The fire's 'fire_name', 'calendar_year' and 'row_position', or None when it
+            does not exist.
+    """
+    assert isinstance(lookup_index, dict) and 'table' in lookup_index, "lookup_index must be returned by Get_fire_lookup_index()."
+    table = lookup_index['table']
+    try:
+        if calendar_year is None:
+            position = lookup_index['number_positions'][lookup_index['numbers'].get_loc(fire_number)]
+        else:
+            position = table.index.get_loc((fire_number, calendar_year))
+    except KeyError:
+        assert calendar_year is not None or fire_number not in lookup_index['reused_numbers'], \
+        f"Fire number {fire_number} is used in the years {Get_fire_years(lookup_index, fire_number)}, give its calendar_year."
+        return None
+    return {'fire_name': table['fire_name'].iat[position],
+            'calendar_year': table.index[position][1].item(),
+            'row_position': int(table['row_position'].iat[position])}
+
+def Lookup_fires(lookup_index, fire_numbers, calendar_years = None):
+    """
+    Looks up many fires at once in the index of Get_fire_lookup_index() with a
+    single vectorized hash probe.
+
+    Parameters:
+        lookup_index - dict
+            Index returned by Get_fire_lookup_index().
+
+        fire_numbers - list-like of str
+            The fire IDs to look up.
+
+        calendar_years - list-like of int
+            The year of every fire. Only needed when some of the fire numbers are
+            used in more than one year.
+
+    Returns:
+        fires - pd.DataFrame
+            One row per requested ID (in the given order), indexed by 'fire_number'.
+            Unknown IDs get a NaN 'fire_name' and 'calendar_year' and a 'row_position'
+            of -1.
+    """
+    assert isinstance(lookup_index, dict) and 'table' in lookup_index, "lookup_index must be returned by Get_fire_lookup_index()."
+    table = lookup_index['table']
+
+    fire_numbers = pd.Index(fire_numbers, name='fire_number')
+    if calendar_years is not None:
+        assert len(calendar_years) == len(fire_numbers), "calendar_years must have one year per fire number."
+        positions = table.index.get_indexer(pd.MultiIndex.from_arrays([fire_numbers, calendar_years]))
+    else:
+        # only the numbers used in a single year can be found without their year
+        ambiguous = fire_numbers[lookup_index['reused_numbers'].get_indexer(fire_numbers) >= 0]
+        assert len(ambiguous) == 0, \
+        f"Fire numbers used in more than one year, give their calendar_years: {sorted(set(ambiguous))[:10]}."
+        positions = lookup_index['numbers'].get_indexer(fire_numbers)
+        positions = np.where(positions >= 0, lookup_index['number_positions'][positions], -1)
+
+    found = positions >= 0
+    fire_names = np.full(len(positions), np.nan, dtype=object)
+    fire_names[found] = table['fire_name'].to_numpy()[positions[found]]
+    years = np.full(len(positions), np.nan)
+    years[found] = table.index.levels[1].to_numpy(dtype=float)[table.index.codes[1][positions[found]]]
+    row_positions = np.full(len(positions), -1, dtype=np.int64)
+    row_positions[found] = table['row_position'].to_numpy()[positions[found]]
+    return pd.DataFrame({'fire_name': fire_names, 'calendar_year': years, 'row_position': row_positions},
+                        index=fire_numbers)
+
+def Get_only_complete_data(unfiltered_df, column_name_list = None, completeness_index = None):
     """
     Returns only rows that are not missing one piece of data. Will become more
     useful once we are able to filter and clean all data.
@@ -264,20 +1287,142 @@ def Get_only_complete_data(unfiltered_df):
         unfiltered_df - pd.DataFrame
             the unfiltered data frame that will be purged of complete columns of data.
 
+        column_name_list - list
+            Only require the rows to be complete in these columns. Defaults to all columns.
+
+        completeness_index - dict
+            Index returned by Build_completeness_index() for 'unfiltered_df'. When given,
+            the rows are selected from its bitmaps instead of checking every value again.
+
     Returns:
         filtered_df - pd.DataFrame
             Contains only rows that are not missing any data. When a value is 'NaN',
             the value is set to zero.
    """
-    columns_list = Get_all_df_columns(unfiltered_df)
+    if column_name_list is None:
+        column_name_list = Get_all_df_columns(unfiltered_df)
 
-    # Create a mask for rows with complete data in all columns
-    row_mask = unfiltered_df[columns_list].notna().all(axis=1)
+    if completeness_index is not None:
+        assert completeness_index['rows'] == len(unfiltered_df), "completeness_index was built for another dataframe."
+        row_mask = Get_complete_rows_mask(completeness_index, column_name_list)
+    else:
+        # Create a mask for rows with complete data in all columns
+        row_mask = unfiltered_df[column_name_list].notna().all(axis=1)
 
     # Filter the DataFrame based on the mask
     filtered_df = unfiltered_df[row_mask]
     return filtered_df
 
+# Number of set bits of every possible byte, used to count rows from the bitmaps
+_BYTE_POPCOUNT = np.array([bin(byte).count('1') for byte in range(256)], dtype=np.uint8)
+
+def Build_completeness_index(unfiltered_df):
+    """
+    Builds a null bitmap for every column of the dataframe: bit i of a column's
+    bitmap is set when row i has a value in that column. Built once, it answers
+    "which/how many rows are complete in these columns" for any subset of columns
+    with bitwise ANDs of the bitmaps (see Get_complete_rows_mask() and
+    Count_complete_rows()).
+
+    Parameter:
+        unfiltered_df - pd.DataFrame
+            The data frame to index.
+
+    Returns:
+        completeness_index - dict
+            'rows': the number of rows, 'bitmaps': the packed bitmap (np.uint8 array)
+            of every column.
+    """
+    assert isinstance(unfiltered_df, pd.DataFrame), "Input must be a pandas dataframe."
+
+    not_null = unfiltered_df.notna()
+    bitmaps = {name: np.packbits(not_null[name].to_numpy(dtype=bool)) for name in unfiltered_df.columns}
+    return {'rows': len(unfiltered_df), 'bitmaps': bitmaps}
+
+def Get_complete_bitmap(completeness_index, column_name_list):
+    """
+    ANDs the bitmaps of the given columns. Returns the packed bitmap of the rows
+    that are complete in all of them.
+    """
+    assert isinstance(completeness_index, dict), "completeness_index must be built by Build_completeness_index()."
+    assert isinstance(column_name_list, list) and len(column_name_list) > 0, "column_name_list must be a non empty list."
+    bitmaps = completeness_index['bitmaps']
+    assert all(name in bitmaps for name in column_name_list), \
+    f"Columns missing from the completeness index: {set(column_name_list) - set(bitmaps)}."
+
+    complete_bitmap = bitmaps[column_name_list[0]].copy()
+    for name in column_name_list[1:]:
+        np.bitwise_and(complete_bitmap, bitmaps[name], out=complete_bitmap)
+    return complete_bitmap
+
+def Get_complete_rows_mask(completeness_index, column_name_list):
+    """
+    Returns a boolean mask (np.ndarray) of the rows that have a value in every one of
+    the given columns.
+    """
+    complete_bitmap = Get_complete_bitmap(completeness_index, column_name_list)
+    return np.unpackbits(complete_bitmap, count=completeness_index['rows']).astype(bool)
+
+def Count_complete_rows(completeness_index, column_name_list):
+    """
+    Returns the number of rows that have a value in every one of the given columns,
+    without building a mask or filtering the dataframe.
+    """
+    complete_bitmap = Get_complete_bitmap(completeness_index, column_name_list)
+    return int(_BYTE_POPCOUNT[complete_bitmap].sum(dtype=np.int64))
+
+def Get_lifecycle_statistics(df, group_column = None, intervals = None, quantiles = (0.5, 0.9)):
+    """
+    Describes the distribution of the lifecycle intervals (see LIFECYCLE_INTERVALS), in
+    hours, overall or for every value of a column.
+
+    Parameters:
+        df - pd.DataFrame
+            The cleaned dataframe (see Get_all_data()), holding the interval columns.
+
+        group_column - str
+            Column whose values get their own statistics (e.g. 'general_cause_desc').
+            The statistics of all fires are returned when None.
+
+        intervals - list
+            Names of the intervals to describe. Defaults to every interval in df.
+
+        quantiles - list
+            Quantiles (between 0 and 1) of every interval.
+
+    Returns:
+        statistics - pd.DataFrame
+            The 'count' of known intervals, 'mean', 'std', 'min', the quantiles (as
+            'q0.5' ...) and 'max' of every interval (columns level 0), one row per
+            value of group_column or a single 'all' row.
+    """
+    if intervals is None:
+        intervals = [name for name in LIFECYCLE_INTERVALS if name in df.columns]
+    assert isinstance(df, pd.DataFrame), "Input must be a pandas dataframe."
+    assert isinstance(intervals, list) and len(intervals) > 0, "No lifecycle interval to describe."
+    assert all(name in df.columns for name in intervals), \
+    f"Columns missing from the DataFrame: {set(intervals) - set(df.columns)}."
+    assert group_column is None or group_column in df.columns, f"Column '{group_column}' is missing from the DataFrame."
+    assert all(0 <= q <= 1 for q in quantiles), "quantiles must be between 0 and 1."
+
+    hours = df[intervals] / pd.Timedelta(hours=1)
+    if group_column is None:
+        groups = hours.groupby(np.zeros(len(hours), dtype=np.int8))
+    else:
+        groups = hours.groupby(df[group_column], sort=True, observed=True)
+
+    statistics = groups.agg(['count', 'mean', 'std', 'min'])
+    for q in quantiles:
+        quantile = groups.quantile(q)
+        quantile.columns = pd.MultiIndex.from_product([quantile.columns, [f"q{q:g}"]])
+        statistics = statistics.join(quantile)
+    statistics = statistics.join(groups.agg(['max']))
+    statistics = statistics[[(name, stat) for name in intervals for stat in
+                             ['count', 'mean', 'std', 'min'] + [f"q{q:g}" for q in quantiles] + ['max']]]
+    if group_column is None:
+        statistics.index = ['all']
+    return statistics
+
 def Get_burn_area_radius(hectares = None):
     """
     Returns general burn radius of a fire (in meters).
@@ -298,7 +1443,107 @@ def Get_burn_area_radius(hectares = None):
     radius = round(math.sqrt(area_in_meters/math.pi), digits_after_decimal)
     return radius
 
-def displaying_burn_area(latitude=None, longitude=None, radius=None, zoom = 20, plotting_circle = True):
+def Get_burn_area_radii(hectares):
+    """
+    Vectorized Get_burn_area_radius(): returns the general burn radius (in meters)
+    of every fire of a hectare column (e.g. ex_hectares or current_size).
+
+    Parameter:
+        hectares - pd.Series or np.ndarray
+            The areas that have been affected by the fires. Missing areas
+            give a missing radius.
+
+    Returns:
+        radii - pd.Series or np.ndarray
+            The radius of a circle covering each area, with the same index as
+            'hectares' when it is a Series.
+    """
+    assert isinstance(hectares, (pd.Series, np.ndarray)), "hectares must be a pandas series or numpy array."
+
+    digits_after_decimal = 4
+    values = np.asarray(hectares, dtype=float)
+    area_in_meters = np.round(values * 10000, digits_after_decimal)
+    radii = np.round(np.sqrt(area_in_meters / np.pi), digits_after_decimal)
+    if isinstance(hectares, pd.Series):
+        return pd.Series(radii, index=hectares.index, name=hectares.name)
+    return radii
+
+def Get_burn_area_zooms(radii, zoom = 20):
+    """
+    Vectorized form of the auto zoom of displaying_burn_area(): returns the map zoom
+    level that fits the burn circle of every radius.
+
+    Beyond 30 m the zoom is lowered once per 10 m of radius, by 0.5/(1 + 0.3*i) at
+    the i-th step, rounded to 5 decimals after every step. Instead of stepping
+    through every radius, the zoom after k steps is read from a table of the steps
+    (built once, up to the largest radius), so every radius costs one lookup and
+    gets the same zoom as the step by step loop.
+
+    Parameters:
+        radii - pd.Series or np.ndarray
+            Burn radii in meters (see Get_burn_area_radii()).
+
+        zoom - int or float
+            The zoom level the steps are taken from.
+
+    Returns:
+        zooms - pd.Series or np.ndarray
+            The zoom level of every radius (nan for a missing radius), with the same
+            index as 'radii' when it is a Series.
+    """
+    assert isinstance(radii, (pd.Series, np.ndarray)), "radii must be a pandas series or numpy array."
+    assert isinstance(zoom, (int, float)), "Must provide a valid zoom value."
+
+    max_zoom = 20
+    values = np.asarray(radii, dtype=float)
+    # number of 10 m steps taken past 30 m
+    steps = np.ceil(np.clip(values - 30, 0, None) / 10)
+    max_steps = int(np.nanmax(steps)) if np.any(steps > 0) else 0
+    # the zoom after every number of steps, taken exactly like the loop did
+    # (with python floats: numpy rounds some of the halves the other way)
+    step_zooms = [zoom]
+    attenuation = 1
+    for _ in range(max_steps):
+        step_zooms.append(round(step_zooms[-1] - 0.5/attenuation, 5))
+        attenuation += 0.3
+    step_zooms = np.array(step_zooms, dtype=float)
+
+    zooms = np.full(values.shape, np.nan)
+    known = ~np.isnan(values)
+    zooms[known] = np.minimum(step_zooms[steps[known].astype(np.int64)], 18.35)
+    zooms[values < 30] = max_zoom
+    zooms[(30 < values) & (values < 38)] = 18.5
+    if isinstance(radii, pd.Series):
+        return pd.Series(zooms, index=radii.index, name='zoom')
+    return zooms
+
+def Add_burn_area_geometry(df, hectare_column = 'current_size', zoom = 20):
+    """
+    Returns a copy of the dataframe with the 'burn_radius' (in meters) and
+    'burn_zoom' map level of every fire, computed from a hectare column.
+
+    Parameters:
+        df - pd.DataFrame
+            The cleaned dataframe (see Get_all_data()).
+
+        hectare_column - str
+            The column holding the burned area, e.g. 'current_size' or 'ex_hectares'.
+
+        zoom - int or float
+            The zoom level the auto zoom starts from (see Get_burn_area_zooms()).
+
+    Returns:
+        df - pd.DataFrame
+            The data with the two new columns.
+    """
+    assert isinstance(df, pd.DataFrame), "Input must be a pandas dataframe."
+    assert hectare_column in df.columns, f"Column '{hectare_column}' is missing from the DataFrame."
+
+    radii = Get_burn_area_radii(df[hectare_column])
+    return df.assign(burn_radius=radii, burn_zoom=Get_burn_area_zooms(radii, zoom))
+
+def displaying_burn_area(latitude=None, longitude=None, radius=None, zoom = 20, plotting_circle = True,
+                         output_path = 'burn_area.html'):
     """
     Creates a .html map that shows the general burn area. Shown by a circle.
 
@@ -311,33 +1556,23 @@ def displaying_burn_area(latitude=None, longitude=None, radius=None, zoom = 20,
         radius - float
             The radius of that the fire covers in meters. Obtain this by first getting return
             value from Get_burn_area_radius().
+        output_path - str
+            Path of the .html file the map is written to.
     Returns:
     ----------
         burn_area - .html file
-            You can open the file called 'burn_area.html' that is created in your current
-            working directory.
+            You can open the file called 'burn_area.html' (or 'output_path') that is
+            created in your current working directory.
     """
     assert latitude is not None and longitude is not None, "Must provide both a latitude and longitude."
     assert radius is not None and radius > 0, "Must provide a radius parameter greater than 0."
     isinstance(zoom, (int, float)), "Must provide a valid zoom value."
     assert isinstance(plotting_circle, bool), "Must provide a bool for plotting_circle."
+    assert isinstance(output_path, str), "output_path must be a string."
 
     # this section aims to properly auto adjust the zoom when creating burn_area
-    attenuation = 1
-    max_zoom = 20
     if plotting_circle:
-        if radius < 30:
-            zoom = max_zoom
-        elif 30 < radius < 38:
-            zoom = 18.5
-        else:
-            temp = radius - 30
-            while temp > 0:
-                zoom -= 0.5/attenuation
-                temp -= 10
-                attenuation += 0.3
-                zoom = round(zoom, 5)
-            zoom = min(zoom, 18.35)
+        zoom = float(Get_burn_area_zooms(np.array([radius]), zoom)[0])
 
     # create the map
     Mymap = folium.Map(location=[latitude, longitude], zoom_start=zoom)
@@ -353,7 +1588,170 @@ def displaying_burn_area(latitude=None, longitude=None, radius=None, zoom = 20,
             fill_opacity=0.2
         ).add_to(Mymap)
 
-    Mymap.save('burn_area.html')
+    Save_map(Mymap, output_path)
+
+def displaying_burn_areas(df, output_path = 'burn_areas.html', radius_column = 'burn_radius',
+                          hectare_column = 'current_size', popup_columns = None, cluster = False):
+    """
+    Creates one .html map that shows the general burn area of every fire of a dataframe.
+
+    The map only holds the fires as one data array; the circles are created from it
+    in the browser and drawn on a single canvas instead of one SVG element per fire,
+    so the map stays responsive with tens of thousands of fires. With 'cluster',
+    every fire is a marker instead and nearby fires are grouped into clusters.
+
+    Parameters:
+    ------------
+        df - pd.DataFrame
+            The fires, with 'fire_location_latitude' and 'fire_location_longitude'.
+            Fires without a location or radius are skipped.
+        output_path - str
+            Path of the .html file the map is written to. Give every concurrent
+            call (e.g. one per year or region) its own path.
+        radius_column - str
+            Column holding the burn radius in meters. When it is missing, the radius
+            is computed from 'hectare_column' (see Get_burn_area_radii()).
+        hectare_column - str
+            Column holding the burned area, used when there is no 'radius_column'.
+        popup_columns - list
+            Columns shown when hovering a circle (or clicking a marker). Defaults to
+            the fire number and name when they are present.
+        cluster - bool
+            Whether to draw clustered markers instead of circles.
+    Returns:
+    ----------
+        output_path - str
+            Path of the written map.
+    """
+    location_columns = ['fire_location_latitude', 'fire_location_longitude']
+    assert isinstance(df, pd.DataFrame), "Input must be a pandas dataframe."
+    assert all(name in df.columns for name in location_columns), f"df must contain the columns {location_columns}."
+    assert radius_column in df.columns or hectare_column in df.columns, \
+    f"df must contain either '{radius_column}' or '{hectare_column}'."
+    assert isinstance(output_path, str), "output_path must be a string."
+    assert isinstance(cluster, bool), "Must provide a bool for cluster."
+    if popup_columns is None:
+        popup_columns = [name for name in ['fire_number', 'fire_name'] if name in df.columns]
+    assert isinstance(popup_columns, list), "popup_columns must be entered in as a list."
+    assert all(name in df.columns for name in popup_columns), \
+    f"Columns missing from the DataFrame: {set(popup_columns) - set(df.columns)}."
+
+    if radius_column in df.columns:
+        radii = df[radius_column].to_numpy(dtype=float)
+    else:
+        radii = Get_burn_area_radii(df[hectare_column].to_numpy(dtype=float))
+    latitudes = df['fire_location_latitude'].to_numpy(dtype=float)
+    longitudes = df['fire_location_longitude'].to_numpy(dtype=float)
+    valid = ~(np.isnan(latitudes) | np.isnan(longitudes) | np.isnan(radii)) & (radii > 0)
+    latitudes, longitudes, radii = latitudes[valid], longitudes[valid], radii[valid]
+    assert len(radii) > 0, "No fire has a location and a burn radius."
+
+    # the popup text of every fire, built column by column
+    popups = pd.Series('', index=range(len(radii)))
+    for name in popup_columns:
+        values = pd.Series(df[name].to_numpy()[valid])
+        popups = popups + f"{name}: " + values.astype(str).where(values.notna(), '') + "<br>"
+
+    Mymap = folium.Map(location=[latitudes.mean(), longitudes.mean()], prefer_canvas=True)
+    Mymap.fit_bounds([[latitudes.min(), longitudes.min()], [latitudes.max(), longitudes.max()]])
+
+    if cluster:
+        # the markers are created by this javascript callback in the browser
+        callback = """
+            function (row) {
+                var marker = L.marker(new L.LatLng(row[0], row[1]));
+                if (row[2]) { marker.bindPopup(row[2]); }
+                return marker;
+            };
+        """
+        data = [[latitude, longitude, popup] for latitude, longitude, popup
+                in zip(latitudes.tolist(), longitudes.tolist(), popups.tolist())]
+        plugins.FastMarkerCluster(data, callback=callback).add_to(Mymap)
+    else:
+        # one element creates every circle in the browser from the data array, on a
+        # shared canvas renderer, instead of one folium element per fire
+        circles = MacroElement()
+        circles._name = 'BurnAreaCircles'
+        circles._template = Template("""
+            {% macro script(this, kwargs) %}
+            (function () {
+                var renderer = L.canvas();
+                var data = {{ this.data|tojson }};
+                for (var i = 0; i < data.length; i++) {
+                    var row = data[i];
+                    var circle = L.circle([row[0], row[1]], {radius: row[2], color: 'grey', weight: 1,
+                        fill: true, fillColor: 'red', fillOpacity: 0.2, renderer: renderer});
+                    if (row[3]) { circle.bindTooltip(row[3]); }
+                    circle.addTo({{ this._parent.get_name() }});
+                }
+            })();
+            {% endmacro %}
+        """)
+        circles.data = [[latitude, longitude, radius, popup] for latitude, longitude, radius, popup
+                        in zip(latitudes.tolist(), longitudes.tolist(), radii.tolist(), popups.tolist())]
+        circles.add_to(Mymap)
+
+    Save_map(Mymap, output_path)
+    return output_path
+
+def displaying_burn_areas_by(df, column, output_dir, max_workers = None, **options):
+    """
+    Creates one burn area map per value of a column (e.g. one per 'calendar_year'),
+    rendering the maps in parallel across a process pool.
+
+    Parameters:
+    ------------
+        df - pd.DataFrame
+            The fires (see displaying_burn_areas()).
+        column - str
+            The column the fires are grouped by.
+        output_dir - str
+            Directory the maps are written to, as 'burn_areas_<column>=<value>.html'
+            (characters unsafe in a file name are replaced by '_').
+        max_workers - int
+            Number of worker processes. Defaults to the number of CPUs.
+        options
+            Any other parameter of displaying_burn_areas().
+    Returns:
+    ----------
+        output_paths - dict
+            Path of the map of every value.
+    """
+    assert isinstance(df, pd.DataFrame), "Input must be a pandas dataframe."
+    assert column in df.columns, f"Column '{column}' is missing from the DataFrame."
+    assert isinstance(output_dir, str), "output_dir must be a string."
+    assert max_workers is None or (isinstance(max_workers, int) and max_workers > 0), "max_workers must be an integer and > zero."
+
+    groups = [(value, group_df) for value, group_df in df.groupby(column, sort=True)]
+    # path separators and other characters unsafe in a file name (e.g. the '/' of
+    # "Non Industrial / Other Industry") are replaced, values that end up with the
+    # same name are numbered
+    output_paths, file_names = {}, set()
+    for value, _ in groups:
+        base_name = re.sub(r"[^\w.=-]+", "_", f"burn_areas_{column}={value}").strip("._")
+        file_name, number = base_name, 1
+        while file_name in file_names:
+            number += 1
+            file_name = f"{base_name}_{number}"
+        file_names.add(file_name)
+        output_paths[value] = os.path.join(output_dir, f"{file_name}.html")
+    render_map = functools.partial(displaying_burn_areas, **options)
+    if len(groups) <= 1 or max_workers == 1:
+        for value, group_df in groups:
+            render_map(group_df, output_paths[value])
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            list(executor.map(render_map, [group_df for _, group_df in groups],
+                              [output_paths[value] for value, _ in groups]))
+    return output_paths
+
+def Save_map(Mymap, output_path):
+    """
+    Writes a folium map to output_path, creating its directory (see
+    Cache_utils.Write_file_atomically()), so concurrent runs never leave a half
+    written file.
+    """
+    Cache.Write_file_atomically(output_path, Mymap.save)
 
 def stop():
     """
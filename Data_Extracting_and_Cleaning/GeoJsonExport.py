@@ -0,0 +1,166 @@
+"""
+Created on October 18, 2026
+
+The goal of this script is to export the burn areas of the fires as compact
+GeoJSON, so web viewers can stream and cache the geometry instead of loading
+a folium .html page. Every fire becomes a polygon approximating its burn
+circle (see Get_burn_area_radii()), written either as one FeatureCollection
+or as line-delimited GeoJSON (one Feature per line).
+"""
+
+from Data_Extracting_and_Cleaning import DataExtractionCleaning as dec
+from Data_Extracting_and_Cleaning.Utils import Cache_utils as Cache
+import numpy as np
+import pandas as pd
+import json
+
+# Mean radius of the earth in meters
+EARTH_RADIUS = 6371008.8
+LOCATION_COLUMNS = ['fire_location_latitude', 'fire_location_longitude']
+
+
+def Get_burn_area_polygons(latitudes, longitudes, radii, vertices = 32):
+    """
+    Returns the vertices of a polygon approximating the burn circle of every fire.
+
+    Parameters:
+        latitudes - np.ndarray
+            Latitudes of the fires' centers, in degrees.
+
+        longitudes - np.ndarray
+            Longitudes of the fires' centers, in degrees.
+
+        radii - np.ndarray
+            Burn radii in meters (see Get_burn_area_radii()).
+
+        vertices - int
+            Number of distinct vertices of every polygon.
+
+    Returns:
+        polygon_longitudes, polygon_latitudes - np.ndarray
+            Arrays of shape (fires, vertices + 1), in degrees. The first vertex is
+            repeated at the end so every ring is closed.
+    """
+    assert isinstance(vertices, int) and vertices >= 3, "vertices must be an integer and >= 3."
+
+    latitudes = np.radians(np.asarray(latitudes, dtype=float))[:, None]
+    longitudes = np.radians(np.asarray(longitudes, dtype=float))[:, None]
+    # angular distance of the circle, and the bearing of every vertex (counterclockwise,
+    # as GeoJSON expects the exterior ring of a polygon)
+    distances = (np.asarray(radii, dtype=float) / EARTH_RADIUS)[:, None]
+    bearings = -np.linspace(0, 2 * np.pi, vertices + 1)[None, :]
+    bearings[:, -1] = 0
+
+    # destination points at the same distance from the center on a sphere
+    sin_latitudes = (np.sin(latitudes) * np.cos(distances)
+                     + np.cos(latitudes) * np.sin(distances) * np.cos(bearings))
+    polygon_latitudes = np.arcsin(sin_latitudes)
+    polygon_longitudes = longitudes + np.arctan2(np.sin(bearings) * np.sin(distances) * np.cos(latitudes),
+                                                 np.cos(distances) - np.sin(latitudes) * sin_latitudes)
+    polygon_longitudes = (polygon_longitudes + np.pi) % (2 * np.pi) - np.pi
+    return np.degrees(polygon_longitudes), np.degrees(polygon_latitudes)
+
+def Get_feature_properties(df, properties):
+    """
+    Returns the JSON compatible values of the property columns, one dict per row.
+    Dates become ISO strings and missing values become null.
+    """
+    columns = {}
+    for name in properties:
+        series = df[name]
+        if pd.api.types.is_datetime64_any_dtype(series):
+            values = series.dt.strftime('%Y-%m-%dT%H:%M:%S').astype(object)
+        elif pd.api.types.is_bool_dtype(series) or pd.api.types.is_numeric_dtype(series):
+            values = series.astype(object)
+        else:
+            values = series.astype(object).map(str, na_action='ignore')
+        columns[name] = np.where(series.notna().to_numpy(), values.to_numpy(dtype=object), None).tolist()
+    return [dict(zip(properties, row)) for row in zip(*columns.values())] if properties else [{}] * len(df)
+
+def Export_burn_areas_geojson(df, output_path, precision = 5, vertices = 32, properties = None,
+                              line_delimited = False, radius_column = 'burn_radius',
+                              hectare_column = 'current_size'):
+    """
+    Writes the burn area of every fire of a dataframe as GeoJSON polygons.
+
+    Parameters:
+        df - pd.DataFrame
+            The fires, with 'fire_location_latitude' and 'fire_location_longitude'.
+            Fires without a location or radius are skipped.
+
+        output_path - str
+            Path of the GeoJSON file (e.g. 'burn_areas.geojson', or '.geojsonl'
+            when line delimited). Its directory is created if needed.
+
+        precision - int
+            Number of decimals of the coordinates. 5 decimals is about 1 m.
+
+        vertices - int
+            Number of vertices of every burn circle's polygon.
+
+        properties - list
+            Columns written as the properties of every feature, along with the
+            burn radius. Defaults to the fire number and name when they are present.
+
+        line_delimited - bool
+            Whether to write one Feature per line instead of one FeatureCollection,
+            so the file can be streamed and read feature by feature.
+
+        radius_column - str
+            Column holding the burn radius in meters. When it is missing, the radius
+            is computed from 'hectare_column' (see Get_burn_area_radii()).
+
+        hectare_column - str
+            Column holding the burned area, used when there is no 'radius_column'.
+
+    Returns:
+        feature_count - int
+            Number of features written.
+    """
+    assert isinstance(df, pd.DataFrame), "Input must be a pandas dataframe."
+    assert all(name in df.columns for name in LOCATION_COLUMNS), f"df must contain the columns {LOCATION_COLUMNS}."
+    assert radius_column in df.columns or hectare_column in df.columns, \
+    f"df must contain either '{radius_column}' or '{hectare_column}'."
+    assert isinstance(output_path, str), "output_path must be a string."
+    assert isinstance(precision, int) and precision >= 0, "precision must be an integer and >= zero."
+    assert isinstance(line_delimited, bool), "line_delimited must be a bool."
+    if properties is None:
+        properties = [name for name in ['fire_number', 'fire_name'] if name in df.columns]
+    assert isinstance(properties, list), "properties must be entered in as a list."
+    assert all(name in df.columns for name in properties), \
+    f"Columns missing from the DataFrame: {set(properties) - set(df.columns)}."
+
+    if radius_column in df.columns:
+        radii = df[radius_column].to_numpy(dtype=float)
+    else:
+        radii = dec.Get_burn_area_radii(df[hectare_column].to_numpy(dtype=float))
+    latitudes = df['fire_location_latitude'].to_numpy(dtype=float)
+    longitudes = df['fire_location_longitude'].to_numpy(dtype=float)
+    valid = ~(np.isnan(latitudes) | np.isnan(longitudes) | np.isnan(radii)) & (radii > 0)
+
+    polygon_longitudes, polygon_latitudes = Get_burn_area_polygons(latitudes[valid], longitudes[valid],
+                                                                   radii[valid], vertices)
+    # rings of [longitude, latitude] pairs, rounded to the requested precision
+    rings = np.round(np.stack([polygon_longitudes, polygon_latitudes], axis=-1), precision).tolist()
+    feature_properties = Get_feature_properties(df[valid], properties)
+    radii = np.round(radii[valid], 4).tolist()
+
+    separator = '\n' if line_delimited else ',\n'
+
+    def write_features(temp_path):
+        with open(temp_path, 'w') as file:
+            if not line_delimited:
+                file.write('{"type":"FeatureCollection","features":[\n')
+            for number, (ring, feature_property, radius) in enumerate(zip(rings, feature_properties, radii)):
+                feature = {'type': 'Feature',
+                           'geometry': {'type': 'Polygon', 'coordinates': [ring]},
+                           'properties': dict(feature_property, burn_radius=radius)}
+                if number > 0:
+                    file.write(separator)
+                file.write(json.dumps(feature, separators=(',', ':')))
+            file.write('\n' if line_delimited and len(rings) > 0 else '')
+            if not line_delimited:
+                file.write('\n]}\n')
+
+    Cache.Write_file_atomically(output_path, write_features)
+    return len(rings)
@@ -0,0 +1,101 @@
+"""
+Created on October 18, 2026
+
+The goal of this script is to share the numeric columns used by the analysis
+functions, the heatmaps and the prediction models between worker processes.
+The columns are exported once as contiguous .npy files; every worker then
+memory-maps them, so all workers on a node read the same physical pages of
+the operating system's file cache instead of each unpickling its own copy.
+"""
+
+from Data_Extracting_and_Cleaning.Utils import Cache_utils as Cache
+import numpy as np
+import pandas as pd
+import json
+import os
+
+SHARED_NUMERIC_COLUMNS = ['fire_location_latitude', 'fire_location_longitude', 'current_size',
+                          'ex_hectares', 'assessment_hectares', 'fire_fighting_start_size']
+MANIFEST_FILE_NAME = 'manifest.json'
+
+
+def Export_numeric_columns(df, store_dir, columns = None):
+    """
+    Writes numeric columns of the dataframe as contiguous .npy arrays, one file
+    per column, plus a manifest describing them.
+
+    Parameters:
+        df - pd.DataFrame
+            The cleaned dataframe (see Get_all_data()).
+
+        store_dir - str
+            Directory the arrays are written to. Created if it does not exist.
+
+        columns - list
+            Names of the numeric columns to export. Defaults to SHARED_NUMERIC_COLUMNS.
+
+    Returns:
+        manifest - dict
+            Number of rows and the dtype of every exported column.
+    """
+    if columns is None:
+        columns = SHARED_NUMERIC_COLUMNS
+    assert isinstance(df, pd.DataFrame), "Input must be a pandas dataframe."
+    assert isinstance(store_dir, str), "store_dir must be a string."
+    assert isinstance(columns, list) and len(columns) > 0, "columns must be a non empty list."
+    assert all(name in df.columns for name in columns), \
+    f"Columns missing from the DataFrame: {set(columns) - set(df.columns)}."
+    assert all(pd.api.types.is_numeric_dtype(df[name]) for name in columns), "All columns must be numeric."
+
+    os.makedirs(store_dir, exist_ok=True)
+    manifest = {'rows': len(df), 'columns': {}}
+    for name in columns:
+        # nullable integer columns are stored as floats so missing values become NaN
+        values = df[name].to_numpy(dtype=float if df[name].hasnans else None)
+        values = np.ascontiguousarray(values)
+        Cache.Write_file_atomically(os.path.join(store_dir, f"{name}.npy"),
+                                    lambda temp_path: np.save(temp_path, values, allow_pickle=False))
+        manifest['columns'][name] = values.dtype.str
+
+    with open(os.path.join(store_dir, MANIFEST_FILE_NAME), 'w') as file:
+        json.dump(manifest, file, indent=4)
+    return manifest
+
+def Load_numeric_columns(store_dir, columns = None, as_frame = True):
+    """
+    Memory-maps the arrays written by Export_numeric_columns(). Nothing is read or
+    copied up front: the returned arrays/frame are read-only views of the files, and
+    the pages are shared by every process that maps the same store.
+
+    Parameters:
+        store_dir - str
+            Directory the arrays were written to.
+
+        columns - list
+            Names of the columns to load. Defaults to every exported column.
+
+        as_frame - bool
+            Whether to return a pd.DataFrame (whose columns are views of the
+            memory-mapped arrays) instead of a dict of arrays.
+
+    Returns:
+        data - pd.DataFrame or dict
+            The memory-mapped columns.
+    """
+    assert isinstance(store_dir, str), "store_dir must be a string."
+    assert isinstance(as_frame, bool), "as_frame must be a bool."
+
+    with open(os.path.join(store_dir, MANIFEST_FILE_NAME)) as file:
+        manifest = json.load(file)
+    if columns is None:
+        columns = list(manifest['columns'])
+    assert isinstance(columns, list), "columns must be entered in as a list."
+    assert all(name in manifest['columns'] for name in columns), \
+    f"Columns missing from the store: {set(columns) - set(manifest['columns'])}."
+
+    arrays = {name: np.load(os.path.join(store_dir, f"{name}.npy"), mmap_mode='r', allow_pickle=False)
+              for name in columns}
+    if not as_frame:
+        return arrays
+    # copy=False keeps every column as its own block backed by the memory map
+    return pd.DataFrame(arrays, copy=False)
@@ -0,0 +1,211 @@
+import hashlib
+import importlib.util
+import inspect
+import os
+import pickle
+
+import pandas as pd
+
+
+def Get_file_fingerprint(file_path=None, block_size=1 << 20):
+    """
+    Returns a hex digest of the contents of a file. Used to tell whether a
+    source file has changed since a cached result was written.
+
+    Parameters:
+        file_path - str
+            Path of the file to fingerprint.
+
+        block_size - int
+            Number of bytes read at a time, so large files are never held in memory.
+
+    Returns:
+        fingerprint - str
+            sha1 hex digest of the file contents.
+    """
+    assert file_path is not None, "No file path was inputted."
+    assert isinstance(file_path, str), "file_path must be of type str."
+
+    digest = hashlib.sha1()
+    with open(file_path, 'rb') as file:
+        for block in iter(lambda: file.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def Get_source_fingerprint(*functions):
+    """
+    Returns a hex digest of the source code of the given functions, so cached
+    results are rebuilt whenever the code that produced them is edited.
+    """
+    digest = hashlib.sha1()
+    for function in functions:
+        digest.update(inspect.getsource(function).encode('utf-8'))
+    return digest.hexdigest()
+
+def Get_df_fingerprint(df, columns=None):
+    """
+    Returns a hex digest of the contents of a DataFrame (its index, column names and
+    values), so results derived from it can be cached per dataset version.
+
+    Parameters:
+        df - pd.DataFrame
+            The dataframe to fingerprint.
+
+        columns - list
+            Only fingerprint these columns. Defaults to every column.
+    """
+    assert isinstance(df, pd.DataFrame), "Input must be a pandas dataframe."
+    if columns is not None:
+        df = df[columns]
+    digest = hashlib.sha1()
+    digest.update(repr((list(df.columns), [str(dtype) for dtype in df.dtypes], df.shape)).encode('utf-8'))
+    digest.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    return digest.hexdigest()
+
+def Get_cache_key(*parts):
+    """
+    Combines any number of fingerprints/options into one short cache key.
+    """
+    digest = hashlib.sha1()
+    for part in parts:
+        digest.update(repr(part).encode('utf-8'))
+    return digest.hexdigest()[:16]
+
+def Write_file_atomically(output_path, write_function):
+    """
+    Writes a file under a temporary name next to output_path (creating its directory)
+    and then renames it, so a reader never sees a half written file. The temporary
+    file keeps the extension of output_path and is removed if the writing fails.
+
+    Parameters:
+        output_path - str
+            Path of the file to write.
+
+        write_function - callable
+            Writes the file to the (temporary) path it is given.
+    """
+    assert isinstance(output_path, str), "output_path must be of type str."
+    os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
+    stem, extension = os.path.splitext(output_path)
+    temp_path = f"{stem}.{os.getpid()}.tmp{extension}"
+    try:
+        write_function(temp_path)
+        os.replace(temp_path, output_path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+def Load_cached_df(cache_path=None):
+    """
+    Loads a DataFrame previously written by Save_cached_df(). Returns None when the
+    cache file does not exist or cannot be read (e.g. pyarrow is not installed).
+    """
+    assert isinstance(cache_path, str), "cache_path must be of type str."
+    if not os.path.exists(cache_path):
+        return None
+    try:
+        return pd.read_parquet(cache_path)
+    except (ImportError, OSError, ValueError) as e:
+        print(f"Warning: could not read cache '{cache_path}': {e}")
+        return None
+
+def Has_parquet_engine():
+    """
+    Returns whether pandas can write Parquet files (pyarrow or fastparquet is installed).
+    """
+    return any(importlib.util.find_spec(engine) is not None for engine in ['pyarrow', 'fastparquet'])
+
+def Save_cached_df(df, cache_path=None):
+    """
+    Writes df to cache_path in Parquet format (see Write_file_atomically()). Nothing
+    is written (and no warning printed) when no Parquet engine is installed.
+
+    Returns:
+        saved - bool
+            False when the cache could not be written (e.g. pyarrow is not installed).
+    """
+    assert isinstance(df, pd.DataFrame), "Input must be a pandas dataframe."
+    assert isinstance(cache_path, str), "cache_path must be of type str."
+    if not Has_parquet_engine():
+        return False
+    try:
+        Write_file_atomically(cache_path, lambda temp_path: df.to_parquet(temp_path, index=False))
+    except (ImportError, OSError, TypeError, ValueError) as e:
+        print(f"Warning: could not write cache '{cache_path}': {e}")
+        return False
+    return True
+
+def Load_cached_object(cache_path=None):
+    """
+    Loads a python object previously written by Save_cached_object(). Returns None
+    when the cache file does not exist or cannot be read.
+    """
+    assert isinstance(cache_path, str), "cache_path must be of type str."
+    if not os.path.exists(cache_path):
+        return None
+    try:
+        with open(cache_path, 'rb') as file:
+            return pickle.load(file)
+    except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError) as e:
+        print(f"Warning: could not read cache '{cache_path}': {e}")
+        return None
+
+def Save_cached_object(obj, cache_path=None):
+    """
+    Pickles obj to cache_path (see Write_file_atomically()).
+
+    Returns:
+        saved - bool
+            False when the cache could not be written.
+    """
+    assert isinstance(cache_path, str), "cache_path must be of type str."
+    def write_pickle(temp_path):
+        with open(temp_path, 'wb') as file:
+            pickle.dump(obj, file, protocol=pickle.HIGHEST_PROTOCOL)
+
+    try:
+        Write_file_atomically(cache_path, write_pickle)
+    except (OSError, pickle.PicklingError, TypeError, AttributeError) as e:
+        print(f"Warning: could not write cache '{cache_path}': {e}")
+        return False
+    return True
+
+def Get_latest_version(versions, fingerprint, build, cache_path=None, load=Load_cached_object,
+                       save=Save_cached_object):
+    """
+    Returns the object derived from one version of the data, building it only once:
+    it is kept in 'versions' (a module level dict holding only the latest version of
+    the data) and, when cache_path is given, also on disk.
+
+    Parameters:
+        versions - dict
+            The objects already built, keyed by the fingerprint of their data.
+
+        fingerprint - str
+            Fingerprint of the data the object is derived from.
+
+        build - callable
+            Builds the object, called without arguments.
+
+        cache_path - str
+            File the object is persisted to. Only kept in memory when None.
+
+        load, save - callable
+            Read the object from a path (None when it cannot be read) and write it
+            to a path. Pickle by default.
+    """
+    if fingerprint in versions:
+        return versions[fingerprint]
+
+    obj = None
+    if cache_path is not None:
+        obj = load(cache_path)
+    if obj is None:
+        obj = build()
+        if cache_path is not None:
+            save(obj, cache_path)
+
+    versions.clear()  # only the latest version of the data is kept
+    versions[fingerprint] = obj
+    return obj
@@ -1,5 +1,7 @@
 import os
 
+DATASET_DIRECTORY_NAME = 'Dataset'
+
 
 def Get_Parent_Directory():
     parent_directory = os.path.abspath('..')
@@ -21,6 +23,32 @@ def To_directory(directory_path_from_main=None):
     except FileNotFoundError as e:
         print(f"Error: {e}")
 
+def Get_project_directory():
+    """
+    Returns the absolute path of the project root (the directory holding
+    'Data_Extracting_and_Cleaning/'), independent of the current working directory.
+    """
+    utils_directory = os.path.dirname(os.path.abspath(__file__))
+    return os.path.dirname(os.path.dirname(utils_directory))
+
+def Get_dataset_directory():
+    """
+    Returns the absolute path of the project's 'Dataset/' directory.
+    """
+    return os.path.join(Get_project_directory(), DATASET_DIRECTORY_NAME)
+
+def Get_dataset_file_path(file_name=None):
+    """
+    Resolves a file of the 'Dataset/' directory to an absolute path without changing
+    the working directory, so it is safe to call from several threads at once.
+    Absolute paths are returned unchanged.
+    """
+    assert file_name is not None, "No file name was inputted."
+    assert isinstance(file_name, str), "file_name must be of type str."
+    if os.path.isabs(file_name):
+        return file_name
+    return os.path.join(Get_dataset_directory(), file_name)
+
 # Used for troubleshooting directory movements
 def Get_available_directory_files():
     current_directory = Get_current_directory(False)
@@ -0,0 +1,126 @@
+import os
+import re
+import time
+
+import pandas as pd
+
+from Data_Extracting_and_Cleaning.Utils import Cache_utils as Cache
+
+
+def Get_stage_key(previous_key, stage):
+    """
+    Returns the cache key of a stage's output. It combines the key of the stage's
+    input (the previous stage's output) with the stage's name, version, source code
+    and rule tables, so editing one stage (or a table it reads) changes its key and
+    the keys of every later stage.
+    """
+    return Cache.Get_cache_key(previous_key, stage['name'], stage['version'],
+                               Cache.Get_source_fingerprint(stage['function']),
+                               repr(stage.get('rules', [])))
+
+def Run_pipeline(df, stages, input_key, cache_dir=None, cache_name='pipeline'):
+    """
+    Runs an ordered list of dataframe stages, timing each one and caching its output.
+
+    Parameters:
+        df - pd.DataFrame
+            Input of the first stage.
+
+        stages - list of dict
+            Every stage has a 'name', a 'version' (bump it to force a recompute) and a
+            'function' taking and returning a pd.DataFrame. A stage may also list
+            the 'rules' (e.g. dicts of default values) its function reads, so
+            editing them invalidates the stage's cached output.
+
+        input_key - str
+            Fingerprint of 'df' (e.g. of the file it was read from).
+
+        cache_dir - str
+            Directory the stage outputs are cached in. Nothing is cached when None.
+            Only the stages after the last cached output are run, so after editing
+            one stage only that stage and the later ones are recomputed.
+
+        cache_name - str
+            Prefix of the cache files, e.g. the name of the input file.
+
+    Returns:
+        df - pd.DataFrame
+            Output of the last stage.
+
+        report - pd.DataFrame
+            One row per stage: 'seconds' of wall time, 'memory_delta_mb' (change of
+            the frame's memory use) and whether the output was loaded from the cache.
+    """
+    assert isinstance(df, pd.DataFrame), "Input must be a pandas dataframe."
+    assert isinstance(stages, list) and len(stages) > 0, "stages must be a non empty list."
+    assert all({'name', 'version', 'function'} <= set(stage) for stage in stages), \
+    "Every stage needs a 'name', a 'version' and a 'function'."
+    assert cache_dir is None or isinstance(cache_dir, str), "cache_dir must be a string."
+
+    stage_keys = []
+    previous_key = input_key
+    for stage in stages:
+        previous_key = Get_stage_key(previous_key, stage)
+        stage_keys.append(previous_key)
+
+    def get_stage_cache_path(stage_number):
+        name = stages[stage_number]['name']
+        return os.path.join(cache_dir, f"{cache_name}-{stage_number:02d}-{name}-{stage_keys[stage_number]}.pkl")
+
+    # resume after the last stage whose output is cached
+    first_stage = 0
+    records = []
+    if cache_dir is not None:
+        for stage_number in range(len(stages) - 1, -1, -1):
+            start = time.perf_counter()
+            cached_df = Cache.Load_cached_object(get_stage_cache_path(stage_number))
+            if cached_df is not None:
+                df = cached_df
+                first_stage = stage_number + 1
+                records = [{'stage': stage['name'], 'seconds': 0.0, 'memory_delta_mb': 0.0, 'cached': True}
+                           for stage in stages[:first_stage]]
+                records[-1]['seconds'] = time.perf_counter() - start
+                break
+
+    memory_before = df.memory_usage(deep=True).sum()
+    for stage_number in range(first_stage, len(stages)):
+        stage = stages[stage_number]
+        start = time.perf_counter()
+        df = stage['function'](df)
+        seconds = time.perf_counter() - start
+        memory_after = df.memory_usage(deep=True).sum()
+        records.append({'stage': stage['name'], 'seconds': seconds,
+                        'memory_delta_mb': (memory_after - memory_before) / 2**20, 'cached': False})
+        memory_before = memory_after
+        if cache_dir is not None:
+            cache_path = get_stage_cache_path(stage_number)
+            if Cache.Save_cached_object(df, cache_path):
+                Remove_stale_stage_caches(cache_path)
+
+    report = pd.DataFrame(records, columns=['stage', 'seconds', 'memory_delta_mb', 'cached']).set_index('stage')
+    return df, report
+
+def Remove_stale_stage_caches(current_cache_path):
+    """
+    Deletes the older cached outputs of the same stage and input.
+    """
+    cache_dir, cache_name = os.path.split(current_cache_path)
+    stage_prefix = cache_name[:cache_name.rindex('-')]
+    cache_file_pattern = re.compile(rf"{re.escape(stage_prefix)}-[0-9a-f]{{16}}\.pkl")
+    for cache_file in os.listdir(cache_dir):
+        cache_file_path = os.path.join(cache_dir, cache_file)
+        if cache_file_pattern.fullmatch(cache_file) and cache_file_path != current_cache_path:
+            os.remove(cache_file_path)
+
+def Print_pipeline_report(report):
+    """
+    Prints the per-stage timing report returned by Run_pipeline().
+    """
+    assert isinstance(report, pd.DataFrame), "report must be a pandas dataframe."
+    title = "Stage timings"
+    print(title)
+    print("--" * len(title))
+    for stage, row in report.iterrows():
+        source = "(cached)" if row['cached'] else ""
+        print(f"{stage.ljust(30)} {row['seconds']:8.3f} s {row['memory_delta_mb']:+10.2f} MB {source}")
+    print(f"{'total'.ljust(30)} {report['seconds'].sum():8.3f} s")
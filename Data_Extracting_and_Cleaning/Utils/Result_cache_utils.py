@@ -0,0 +1,176 @@
+import collections
+import functools
+import hashlib
+import os
+
+import numpy as np
+import pandas as pd
+
+from Data_Extracting_and_Cleaning.Utils import Cache_utils as Cache
+
+# The in-memory tier, least recently used result first
+_results = collections.OrderedDict()
+_settings = {'max_entries': 128, 'cache_dir': None}
+_statistics = {'hits': 0, 'disk_hits': 0, 'misses': 0, 'evictions': 0}
+# Name prefix of the result files of the on-disk tier
+RESULT_FILE_PREFIX = 'result-'
+
+
+def Configure_result_cache(max_entries=128, cache_dir=None):
+    """
+    Sets the size of the in-memory tier of the result cache and the directory of its
+    on-disk tier.
+
+    Parameters:
+        max_entries - int
+            Number of results kept in memory. The least recently used one is evicted
+            when a new result would exceed it.
+
+        cache_dir - str
+            Directory every result is also pickled to, so it survives the process
+            (e.g. a restarted notebook kernel). Results are only kept in memory when None.
+    """
+    assert isinstance(max_entries, int) and max_entries > 0, "max_entries must be an integer and > zero."
+    assert cache_dir is None or isinstance(cache_dir, str), "cache_dir must be a string."
+    _settings['max_entries'] = max_entries
+    _settings['cache_dir'] = cache_dir
+    while len(_results) > max_entries:
+        _results.popitem(last=False)
+        _statistics['evictions'] += 1
+
+def Get_result_cache_statistics():
+    """
+    Returns the number of hits (from memory and from disk), misses and evictions of the
+    result cache, its hit rate and the number of results held in memory.
+    """
+    statistics = dict(_statistics, entries=len(_results))
+    calls = _statistics['hits'] + _statistics['disk_hits'] + _statistics['misses']
+    statistics['hit_rate'] = (_statistics['hits'] + _statistics['disk_hits']) / calls if calls else 0.0
+    return statistics
+
+def Clear_result_cache(disk=False):
+    """
+    Empties the in-memory tier and resets the statistics. The on-disk tier is also
+    emptied when disk is True: only the result files are deleted, so a cache_dir
+    shared with other caches (e.g. the cleaning stages) keeps their files.
+    """
+    _results.clear()
+    for name in _statistics:
+        _statistics[name] = 0
+    if disk and _settings['cache_dir'] is not None and os.path.isdir(_settings['cache_dir']):
+        for cache_file in os.listdir(_settings['cache_dir']):
+            if cache_file.startswith(RESULT_FILE_PREFIX) and cache_file.endswith('.pkl'):
+                os.remove(os.path.join(_settings['cache_dir'], cache_file))
+
+def Get_column_fingerprint(series):
+    """
+    Returns a fingerprint of the values of a column. Numeric, date and categorical
+    columns are hashed straight from their memory, which takes a few milliseconds.
+    Text columns are hashed value by value on every call, so a column modified in
+    place (e.g. with df.loc) is noticed like any other change.
+    """
+    dtype = series.dtype
+    if isinstance(dtype, np.dtype) and dtype.kind in 'biufcmM':
+        values = np.ascontiguousarray(series.to_numpy())
+        return hashlib.sha1(values.view(np.uint8)).hexdigest()
+    if isinstance(dtype, pd.CategoricalDtype):
+        codes = np.ascontiguousarray(series.cat.codes.to_numpy())
+        return Cache.Get_cache_key(hashlib.sha1(codes.view(np.uint8)).hexdigest(),
+                                   Get_column_fingerprint(pd.Series(dtype.categories)))
+    return hashlib.sha1(pd.util.hash_pandas_object(series, index=False).to_numpy().tobytes()).hexdigest()
+
+def Get_frame_fingerprint(df, columns=None):
+    """
+    Returns a fingerprint of a DataFrame (its index, column names, dtypes and the values
+    of 'columns', or of every column) built from the fingerprints of its columns.
+    """
+    if columns is None:
+        columns = list(df.columns)
+    index = df.index
+    if isinstance(index, pd.RangeIndex):
+        index_key = (index.start, index.stop, index.step)
+    else:
+        index_key = hashlib.sha1(pd.util.hash_pandas_object(index).to_numpy().tobytes()).hexdigest()
+    return Cache.Get_cache_key(df.shape, list(df.columns), [str(dtype) for dtype in df.dtypes], index_key,
+                               [Get_column_fingerprint(df[name]) for name in columns])
+
+def Get_argument_key(value, column_names):
+    """
+    Returns a hashable key of one argument. DataFrames and Series are replaced by a
+    fingerprint of their contents; a DataFrame is only fingerprinted on the columns the
+    call refers to (column_names), which is much cheaper than hashing the whole frame.
+    """
+    if isinstance(value, pd.DataFrame):
+        columns = [name for name in value.columns if name in column_names]
+        return ('DataFrame', Get_frame_fingerprint(value, columns or None))
+    if isinstance(value, pd.Series):
+        return ('Series', Get_frame_fingerprint(value.to_frame()))
+    if isinstance(value, (list, tuple)):
+        return (type(value).__name__,) + tuple(Get_argument_key(item, column_names) for item in value)
+    if isinstance(value, dict):
+        return ('dict',) + tuple(sorted((key, Get_argument_key(item, column_names)) for key, item in value.items()))
+    return value
+
+def Get_column_names(values):
+    """
+    Returns every string found in the arguments of a call, as the candidate column names.
+    """
+    names = set()
+    for value in values:
+        if isinstance(value, str):
+            names.add(value)
+        elif isinstance(value, (list, tuple)):
+            names |= Get_column_names(value)
+    return names
+
+def Cached_result(function):
+    """
+    Decorator memoizing the results of an analysis function. The key combines the
+    function's name and code with its arguments, where dataframes are replaced by a
+    fingerprint of the columns the call uses, so a result is only reused while the
+    data it was computed from is unchanged. Results are returned as copies, so a
+    caller modifying one never alters the cache.
+    """
+    source_fingerprint = Cache.Get_source_fingerprint(function)
+
+    @functools.wraps(function)
+    def cached_function(*args, **kwargs):
+        column_names = Get_column_names(list(args) + list(kwargs.values()))
+        key = Cache.Get_cache_key(function.__module__, function.__qualname__, source_fingerprint,
+                                  [Get_argument_key(value, column_names) for value in args],
+                                  sorted((name, Get_argument_key(value, column_names)) for name, value in kwargs.items()))
+        if key in _results:
+            _statistics['hits'] += 1
+            _results.move_to_end(key)
+            return Copy_result(_results[key])
+
+        cache_path = None
+        result = None
+        if _settings['cache_dir'] is not None:
+            cache_path = os.path.join(_settings['cache_dir'], f"{RESULT_FILE_PREFIX}{function.__name__}-{key}.pkl")
+            result = Cache.Load_cached_object(cache_path)
+        if result is not None:
+            _statistics['disk_hits'] += 1
+        else:
+            _statistics['misses'] += 1
+            result = function(*args, **kwargs)
+            if cache_path is not None:
+                Cache.Save_cached_object(result, cache_path)
+
+        _results[key] = result
+        if len(_results) > _settings['max_entries']:
+            _results.popitem(last=False)
+            _statistics['evictions'] += 1
+        return Copy_result(result)
+    return cached_function
+
+def Copy_result(result):
+    """
+    Returns a copy of pandas and numpy results, and of every element of tuple and list
+    results (e.g. a matrix and its pairs); any other result as is.
+    """
+    if isinstance(result, (pd.DataFrame, pd.Series, np.ndarray)):
+        return result.copy()
+    if isinstance(result, (tuple, list)):
+        return type(result)(Copy_result(item) for item in result)
+    return result